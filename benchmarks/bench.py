@@ -0,0 +1,150 @@
+#---------------------------------------------------------------------------
+#
+#  Benchmarks for the X-Plane OBJ importer
+#
+#  python benchmarks/bench.py                  time the parser on all cases
+#  python benchmarks/bench.py --scale 0.1      smaller files for a quick run
+#  python benchmarks/bench.py --blender blender
+#                                              also time the full import
+#  python benchmarks/bench.py --compare benchmarks/results/abc1234.json
+#                                              compare with an earlier commit
+#
+#  The results are saved as benchmarks/results/<commit>.json
+#
+#---------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+
+from generate import writeObj
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from xplane11import import parser as objParser
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+FILES_DIR = os.path.join(BENCH_DIR, 'files')
+
+# name -> writeObj arguments
+CASES = {
+    # a typical small cockpit part
+    'baseline': dict(verts=20000, groups=200, trisPerGroup=50, animDepth=1, keys=4, animEvery=4),
+    # many small TRIS groups drawing from one huge VT pool
+    'small-tris-huge-pool': dict(verts=400000, groups=3000, trisPerGroup=4),
+    # every group inside 30 nested ANIM_begin blocks
+    'deep-nesting': dict(verts=5000, groups=300, trisPerGroup=10, animDepth=30, keys=2),
+    # long ANIM_rotate_key and ANIM_trans_key tables
+    'long-rotate-keys': dict(verts=5000, groups=100, trisPerGroup=10, animDepth=1, keys=2000),
+}
+
+# counts that are scaled with --scale
+SCALED = ('verts', 'groups', 'keys')
+
+
+def getCommit():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL)
+        return commit.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def getCaseFile(name, scale):
+    # generated files are kept, they only depend on the case and the scale
+    params = dict(CASES[name])
+    for key in SCALED:
+        if(key in params):
+            params[key] = max(1, int(params[key] * scale))
+    if(not os.path.isdir(FILES_DIR)):
+        os.makedirs(FILES_DIR)
+    filepath = os.path.join(FILES_DIR, '%s_%g.obj' % (name, scale))
+    if(not os.path.isfile(filepath)):
+        writeObj(filepath, **params)
+    return filepath
+
+
+def timeParser(filepath, useNumpy, repeat):
+    # best of several runs
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        objParser.parseFile(filepath, useNumpy)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def timeBlender(blender, filepath):
+    # full import in a fresh background Blender
+    script = os.path.join(BENCH_DIR, 'blender_import.py')
+    output = subprocess.check_output([blender, '--background', '--factory-startup', '--python', script, '--', filepath], stderr=subprocess.STDOUT)
+    match = re.search(r'BENCH_SECONDS ([0-9.]+)', output.decode(errors='replace'))
+    if(match is None):
+        print(output.decode(errors='replace'))
+        return None
+    return float(match.group(1))
+
+
+def compare(results, previousPath):
+    f = open(previousPath, 'r')
+    previous = json.load(f)
+    f.close()
+    print('\ncompared with %s' % previous['commit'])
+    for name, case in results['cases'].items():
+        old = previous['cases'].get(name, {})
+        for key, seconds in case.items():
+            if(key.startswith('seconds') and seconds and old.get(key)):
+                print('%-22s %-16s %8.3fs  %8.3fs  %+6.1f%%' % (name, key, old[key], seconds, (seconds / old[key] - 1.0) * 100.0))
+
+
+def main():
+    argParser = argparse.ArgumentParser(description='Benchmark the X-Plane OBJ importer')
+    argParser.add_argument('--cases', nargs='*', default=list(CASES), choices=list(CASES))
+    argParser.add_argument('--scale', type=float, default=1.0, help='scale the vertex, group and keyframe counts')
+    argParser.add_argument('--repeat', type=int, default=3)
+    argParser.add_argument('--blender', help='Blender executable, also time the full import')
+    argParser.add_argument('--compare', help='results JSON of an earlier run')
+    argParser.add_argument('--output', help='where to save the results, default benchmarks/results/<commit>.json')
+    args = argParser.parse_args()
+
+    results = {
+        'commit': getCommit(),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': objParser.numpy.__version__ if objParser.numpy is not None else None,
+        'scale': args.scale,
+        'cases': {},
+    }
+
+    for name in args.cases:
+        filepath = getCaseFile(name, args.scale)
+        case = {'sizeMB': round(os.path.getsize(filepath) / 1048576.0, 2)}
+        case['secondsPython'] = timeParser(filepath, False, args.repeat)
+        if(objParser.numpy is not None):
+            case['secondsNumpy'] = timeParser(filepath, True, args.repeat)
+        if(args.blender):
+            case['secondsBlender'] = timeBlender(args.blender, filepath)
+        results['cases'][name] = case
+        print('%-22s %s' % (name, ', '.join('%s %.4g' % item for item in case.items() if item[1] is not None)))
+
+    output = args.output or os.path.join(RESULTS_DIR, '%s.json' % results['commit'])
+    if(not os.path.isdir(os.path.dirname(os.path.abspath(output)))):
+        os.makedirs(os.path.dirname(os.path.abspath(output)))
+    f = open(output, 'w')
+    json.dump(results, f, indent=2)
+    f.close()
+    print('results saved to %s' % output)
+
+    if(args.compare):
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
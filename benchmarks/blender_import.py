@@ -0,0 +1,34 @@
+#---------------------------------------------------------------------------
+#
+#  Time the full import inside Blender, used by bench.py:
+#
+#  blender --background --factory-startup --python benchmarks/blender_import.py -- file.obj
+#
+#  Prints a line 'BENCH_SECONDS <seconds>' that bench.py reads.
+#
+#---------------------------------------------------------------------------
+
+import os
+import sys
+import time
+
+import bpy
+
+# the add-on is imported from this checkout, not from the Blender add-ons folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import xplane11import
+
+
+def main():
+    filepath = sys.argv[sys.argv.index('--') + 1]
+    xplane11import.register()
+
+    start = time.perf_counter()
+    bpy.ops.object.xplane11import(filepath=filepath, use_parallel=False)
+    seconds = time.perf_counter() - start
+
+    print('BENCH_SECONDS %f' % seconds)
+    print('BENCH_OBJECTS %d' % len(bpy.data.objects))
+
+
+main()
@@ -0,0 +1,100 @@
+#---------------------------------------------------------------------------
+#
+#  Write synthetic X-Plane OBJ8 files for the benchmarks
+#
+#  python benchmarks/generate.py out.obj --verts 100000 --groups 500
+#
+#---------------------------------------------------------------------------
+
+import argparse
+import math
+import random
+
+
+def writeObj(filepath, verts=10000, groups=100, trisPerGroup=20, animDepth=0, keys=2, animEvery=1, textures=True, labels=True, seed=1):
+    # verts: size of the VT pool
+    # groups: number of TRIS commands, each one draws trisPerGroup random triangles from the pool
+    # animDepth: number of nested ANIM_begin blocks around every animEvery-th group
+    # keys: ANIM_rotate_key and ANIM_trans_key lines in each anim block
+    rnd = random.Random(seed)
+    numIndices = groups * trisPerGroup * 3
+
+    f = open(filepath, 'w')
+    f.write('I\n800\nOBJ\n\n')
+    if(textures):
+        f.write('TEXTURE bench.png\n')
+        f.write('TEXTURE_NORMAL bench_NML.png\n')
+        f.write('TEXTURE_LIT bench_LIT.png\n')
+    f.write('POINT_COUNTS %d 0 0 %d\n\n' % (verts, numIndices))
+
+    for i in range(verts):
+        # points on a unit sphere, the normal is the position
+        z = rnd.uniform(-1.0, 1.0)
+        a = rnd.uniform(0.0, 2.0 * math.pi)
+        r = math.sqrt(1.0 - z * z)
+        x, y = r * math.cos(a), r * math.sin(a)
+        f.write('VT %.6f %.6f %.6f %.6f %.6f %.6f %.6f %.6f\n' % (x, y, z, x, y, z, rnd.random(), rnd.random()))
+    f.write('\n')
+
+    # triangles near each other in the pool, like the output of the exporter
+    indices = []
+    for group in range(groups):
+        start = rnd.randrange(max(verts - trisPerGroup * 3, 1))
+        for i in range(trisPerGroup * 3):
+            indices.append(min(start + rnd.randrange(trisPerGroup * 3), verts - 1))
+    tens = len(indices) - len(indices) % 10
+    for i in range(0, tens, 10):
+        f.write('IDX10 %s\n' % ' '.join(map(str, indices[i:i + 10])))
+    for index in indices[tens:]:
+        f.write('IDX %d\n' % index)
+    f.write('\n')
+
+    f.write('ATTR_LOD 0 1000\n')
+    for group in range(groups):
+        animated = animDepth > 0 and group % animEvery == 0
+        if(animated):
+            for depth in range(animDepth):
+                if(labels):
+                    f.write('# arm_%d_%d\n' % (group, depth))
+                f.write('ANIM_begin\n')
+                writeKeys(f, rnd, keys, 'bench/group%d/depth%d' % (group, depth))
+        if(labels):
+            f.write('# mesh_%d\n' % group)
+        f.write('TRIS %d %d\n' % (group * trisPerGroup * 3, trisPerGroup * 3))
+        if(animated):
+            f.write('ANIM_end\n' * animDepth)
+
+    f.close()
+    return filepath
+
+
+def writeKeys(f, rnd, keys, dataref):
+    # one translation and one rotation table per anim block
+    f.write('ANIM_trans_begin %s_trans\n' % dataref)
+    for key in range(keys):
+        f.write('ANIM_trans_key %d %.4f %.4f %.4f\n' % (key, rnd.random(), rnd.random(), rnd.random()))
+    f.write('ANIM_trans_end\n')
+    f.write('ANIM_rotate_begin 0 1 0 %s_rot\n' % dataref)
+    for key in range(keys):
+        f.write('ANIM_rotate_key %d %.2f\n' % (key, key * 360.0 / max(keys, 1)))
+    f.write('ANIM_rotate_end\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic X-Plane OBJ8 file')
+    parser.add_argument('filepath')
+    parser.add_argument('--verts', type=int, default=10000)
+    parser.add_argument('--groups', type=int, default=100)
+    parser.add_argument('--tris-per-group', type=int, default=20)
+    parser.add_argument('--anim-depth', type=int, default=0)
+    parser.add_argument('--keys', type=int, default=2)
+    parser.add_argument('--anim-every', type=int, default=1)
+    parser.add_argument('--no-textures', action='store_true')
+    parser.add_argument('--no-labels', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    writeObj(args.filepath, args.verts, args.groups, args.tris_per_group, args.anim_depth, args.keys, args.anim_every, not args.no_textures, not args.no_labels, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#---------------------------------------------------------------------------
+#
+#  The model cache must return exactly what the parser returns
+#
+#  python -m unittest discover tests
+#
+#  Runs without Blender, with and without numpy.
+#
+#---------------------------------------------------------------------------
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from generate import writeObj
+from xplane11import import cache
+from xplane11import.parser import parseFile, numpy
+from test_split import getModelData
+
+
+class ModelCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.directory, 'cache')
+        self.version = cache.CACHE_VERSION
+
+    def tearDown(self):
+        cache.CACHE_VERSION = self.version
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def writeObj(self, name, seed=1):
+        return writeObj(os.path.join(self.directory, name), verts=500, groups=8, trisPerGroup=5, animDepth=2, keys=3, animEvery=2, seed=seed)
+
+    def assertCached(self, useNumpy):
+        filepath = self.writeObj('cached.obj')
+        self.assertIsNone(cache.ModelCache(self.cacheDir).load(filepath, useNumpy))
+        cache.parseFileCached(filepath, self.cacheDir, useNumpy=useNumpy)
+        model = cache.ModelCache(self.cacheDir).load(filepath, useNumpy)
+        self.assertIsNotNone(model)
+        expected = parseFile(filepath, useNumpy)
+        self.assertEqual(getModelData(expected), getModelData(model))
+        # the parts getModelData doesn't compare
+        self.assertEqual([group.state for group in expected.objects], [group.state for group in model.objects])
+        self.assertEqual([[child.label for child in block.children] for block in expected.armatures], [[child.label for child in block.children] for block in model.armatures])
+        self.assertEqual(sorted(expected.datarefUsers), sorted(model.datarefUsers))
+
+    def testHitPython(self):
+        self.assertCached(False)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def testHitNumpy(self):
+        self.assertCached(True)
+
+    def testChangedFile(self):
+        filepath = self.writeObj('changed.obj')
+        cache.parseFileCached(filepath, self.cacheDir)
+        self.writeObj('changed.obj', seed=2)
+        os.utime(filepath, (0, 0))
+        self.assertIsNone(cache.ModelCache(self.cacheDir).load(filepath))
+
+    def testCopy(self):
+        # a copy in another place is found by its content hash
+        filepath = self.writeObj('original.obj')
+        cache.parseFileCached(filepath, self.cacheDir)
+        copy = os.path.join(self.directory, 'copy.obj')
+        shutil.copy(filepath, copy)
+        model = cache.ModelCache(self.cacheDir).load(copy)
+        self.assertIsNotNone(model)
+        self.assertEqual(model.filepath, copy)
+
+    def testVersion(self):
+        # entries of another cache version are ignored
+        filepath = self.writeObj('version.obj')
+        cache.parseFileCached(filepath, self.cacheDir)
+        cache.CACHE_VERSION += 1
+        self.assertIsNone(cache.ModelCache(self.cacheDir).load(filepath))
+
+    def testEviction(self):
+        # the least recently used data goes first, its path entry with it
+        old = self.writeObj('old.obj', seed=1)
+        new = self.writeObj('new.obj', seed=2)
+        cache.parseFileCached(old, self.cacheDir)
+        cache.parseFileCached(new, self.cacheDir)
+        modelCache = cache.ModelCache(self.cacheDir)
+        oldData = modelCache.getDataPath(cache.getFileHash(old))
+        newData = modelCache.getDataPath(cache.getFileHash(new))
+        os.utime(oldData, (0, 0))
+
+        modelCache.maxSize = os.path.getsize(newData)
+        modelCache.evict()
+        self.assertFalse(os.path.exists(oldData))
+        self.assertFalse(os.path.exists(modelCache.getPathEntry(old)))
+        self.assertTrue(os.path.exists(newData))
+        self.assertTrue(os.path.exists(modelCache.getPathEntry(new)))
+        self.assertIsNone(modelCache.load(old))
+        self.assertIsNotNone(modelCache.load(new))
+
+    def testOrphanedPathEntries(self):
+        # path entries of older versions and of removed data are cleaned up
+        first = self.writeObj('first.obj', seed=1)
+        second = self.writeObj('second.obj', seed=2)
+        cache.parseFileCached(first, self.cacheDir)
+        cache.CACHE_VERSION += 1
+        cache.parseFileCached(second, self.cacheDir)
+        modelCache = cache.ModelCache(self.cacheDir)
+        os.remove(modelCache.getDataPath(cache.getFileHash(second)))
+
+        modelCache.removePathEntries()
+        self.assertFalse(os.path.exists(modelCache.getPathEntry(first)))
+        self.assertFalse(os.path.exists(modelCache.getPathEntry(second)))
+
+
+if __name__ == '__main__':
+    unittest.main()
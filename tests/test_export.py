@@ -0,0 +1,136 @@
+#---------------------------------------------------------------------------
+#
+#  The exported .xpc and glTF files must hold exactly the parsed model
+#
+#  python -m unittest discover tests
+#
+#  Runs without Blender, with and without numpy.
+#
+#---------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from generate import writeObj
+from xplane11import.container import readContainer
+from xplane11import.export import writeModelContainer, writeGltf, exportFiles, GLTF_UNSIGNED_INT
+from xplane11import.model import ObjModel
+from xplane11import.parser import parseFile, numpy
+from test_split import getModelData
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filepath = writeObj(os.path.join(self.directory, 'export.obj'), verts=500, groups=8, trisPerGroup=5, animDepth=2, keys=3, animEvery=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def assertContainer(self, useNumpy):
+        model = parseFile(self.filepath, useNumpy)
+        outputPath = os.path.join(self.directory, 'export.xpc')
+        writeModelContainer(outputPath, model)
+        meta, arrays = readContainer(outputPath, useNumpy)
+        self.assertEqual(meta['format'], 'xplane11import-model')
+        self.assertEqual(meta['source'], os.path.abspath(self.filepath))
+        self.assertEqual(json.loads(json.dumps(model.getTree())), meta['tree'])
+
+        # the model can be rebuilt from the container alone
+        loaded = ObjModel(self.filepath)
+        loaded.setTree(meta['tree'])
+        loaded.setKeyframeArrays(arrays)
+        loaded.setGeometryArrays(arrays)
+        self.assertEqual(getModelData(model), getModelData(loaded))
+
+    def testContainerPython(self):
+        self.assertContainer(False)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def testContainerNumpy(self):
+        self.assertContainer(True)
+
+    def readGltf(self, model):
+        outputPath = os.path.join(self.directory, 'export.gltf')
+        writeGltf(outputPath, model)
+        f = open(outputPath, 'r')
+        gltf = json.load(f)
+        f.close()
+        f = open(os.path.join(self.directory, gltf['buffers'][0]['uri']), 'rb')
+        data = f.read()
+        f.close()
+        return gltf, data
+
+    def readAccessor(self, gltf, data, index):
+        accessor = gltf['accessors'][index]
+        view = gltf['bufferViews'][accessor['bufferView']]
+        width = {'SCALAR': 1, 'VEC2': 2, 'VEC3': 3}[accessor['type']]
+        count = accessor['count'] * width
+        start = view['byteOffset'] + accessor.get('byteOffset', 0)
+        return struct.unpack_from('<%d%s' % (count, 'I' if accessor['componentType'] == GLTF_UNSIGNED_INT else 'f'), data, start)
+
+    def assertGltf(self, useNumpy):
+        model = parseFile(self.filepath, useNumpy)
+        gltf, data = self.readGltf(model)
+        self.assertEqual(len(data), gltf['buffers'][0]['byteLength'])
+        self.assertEqual(len(gltf['materials']), len(model.materials))
+
+        # the vertex pool as it is, with the UVs flipped
+        verts = [tuple(vert) for vert in model.verts]
+        positions = self.readAccessor(gltf, data, 0)
+        self.assertEqual(len(positions), 3 * len(verts))
+        self.assertAlmostEqual(positions[3], verts[1][0], places=5)
+        self.assertEqual(gltf['accessors'][0]['min'], [min(axis) for axis in zip(*verts)])
+        uv = self.readAccessor(gltf, data, 2)
+        self.assertAlmostEqual(uv[1], 1.0 - float(model.uv[0][1]), places=5)
+
+        # one node per anim block and TRIS group, each mesh with the index range of its group
+        nodes = {node['name']: node for node in gltf['nodes'][1:]}
+        self.assertEqual(len(gltf['nodes']), 1 + len(model.armatures) + len(model.objects) + sum(len(block.meshes) for block in model.armatures))
+        faces = [int(index) for index in model.faces]
+        for group in model.objects + [group for block in model.armatures for group in block.meshes]:
+            node = nodes[group.label]
+            mesh = gltf['meshes'][node['mesh']]
+            indices = self.readAccessor(gltf, data, mesh['primitives'][0]['indices'])
+            self.assertEqual(list(indices), faces[group.offset:group.offset + group.count])
+            self.assertEqual(len(node['extras']['keyframes']), len(group.kf))
+
+        # the keyframes of the blocks are in the node extras
+        store = model.keyframes
+        for block in model.armatures:
+            node = nodes[block.label]
+            keys = node['extras']['keyframes']
+            self.assertEqual(len(keys), len(block.kf))
+            for key, i in zip(keys, block.kf.indices()):
+                self.assertAlmostEqual(key['value'], store.values[i])
+            refs = sorted(set(store.refs[i] for i in block.kf.indices() if store.refs[i] >= 0))
+            self.assertEqual(node['extras']['datarefs'], [store.datarefs[ref] for ref in refs])
+            if(block.parent is not None):
+                self.assertIn(gltf['nodes'].index(node), nodes[block.parent.label]['children'])
+
+    def testGltfPython(self):
+        self.assertGltf(False)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def testGltfNumpy(self):
+        self.assertGltf(True)
+
+    def testExportFiles(self):
+        output = os.path.join(self.directory, 'out')
+        written = exportFiles([self.filepath], output, maxWorkers=1)
+        self.assertEqual(written, [os.path.join(output, 'export.xpc')])
+        written = exportFiles([self.filepath], output, gltf=True, maxWorkers=1)
+        self.assertEqual(written, [os.path.join(output, 'export.gltf')])
+        self.assertTrue(os.path.isfile(os.path.join(output, 'export.bin')))
+
+
+if __name__ == '__main__':
+    unittest.main()
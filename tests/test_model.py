@@ -0,0 +1,116 @@
+#---------------------------------------------------------------------------
+#
+#  ObjModel checks on small hand written OBJ8 snippets
+#
+#  python -m unittest discover tests
+#
+#---------------------------------------------------------------------------
+
+import os
+import sys
+import unittest
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from xplane11import.parser import numpy
+from xplane11import.model import KeyframeStore, Keyframes, KEY_LOC
+from test_parser import parseText
+
+
+class KeyframesTest(unittest.TestCase):
+    def setUp(self):
+        self.store = KeyframeStore()
+        for i in range(8):
+            self.store.add(KEY_LOC, (0.0, 0.0, float(i)), float(i), 0.0, self.store.intern('sim/key'))
+
+    def testAppend(self):
+        # contiguous keyframes extend the last range
+        kf = Keyframes(self.store)
+        for index in (0, 1, 2, 5, 6):
+            kf.append(index)
+        self.assertEqual(list(kf.ranges), [0, 3, 5, 7])
+        self.assertEqual(len(kf), 5)
+        self.assertEqual(list(kf.indices()), [0, 1, 2, 5, 6])
+
+    def testAdd(self):
+        first = Keyframes(self.store, array('i', [0, 2]))
+        second = Keyframes(self.store, array('i', [2, 4, 6, 7]))
+        # touching ranges are merged, the operands are not changed
+        self.assertEqual(list((first + second).ranges), [0, 4, 6, 7])
+        self.assertEqual(list(first.ranges), [0, 2])
+        self.assertEqual(list(second.ranges), [2, 4, 6, 7])
+        self.assertEqual(list((second + first).ranges), [2, 4, 6, 7, 0, 2])
+        self.assertEqual(list((Keyframes(self.store) + second).ranges), [2, 4, 6, 7])
+        self.assertEqual(list((first + Keyframes(self.store)).ranges), [0, 2])
+        self.assertEqual(len(first + second), 5)
+
+    def testHash(self):
+        # equal keyframes have the same hash at any place in the store
+        store = self.store
+        store.add(KEY_LOC, (0.0, 0.0, 0.0), 0.0, 0.0, store.intern('sim/key'))
+        self.assertEqual(Keyframes(store, array('i', [0, 1])).getHash(), Keyframes(store, array('i', [8, 9])).getHash())
+        self.assertNotEqual(Keyframes(store, array('i', [0, 1])).getHash(), Keyframes(store, array('i', [1, 2])).getHash())
+
+
+class DatarefIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.model = parseText('''ANIM_begin
+ANIM_rotate 0 0 1 0 90 0 1 sim/a
+TRIS 0 3
+ANIM_begin
+ANIM_trans 0 0 0 0 0 1 0 1 sim/b
+ANIM_rotate 1 0 0 0 45 0 1 sim/a
+TRIS 0 3
+ANIM_end
+ANIM_end
+ANIM_begin
+ANIM_show 0 1 sim/b
+TRIS 0 3
+ANIM_end
+TRIS 0 3
+''')
+
+    def getUsers(self, dataref):
+        return [(owner.label, list(indices)) for owner, indices in self.model.getDatarefUsers(dataref)]
+
+    def testUsers(self):
+        # the nested block only lists its own keyframes, the loose animated group is a user too
+        self.assertEqual(self.getUsers('sim/a'), [('ARM1', [4, 5]), ('ARM0', [0, 1])])
+        self.assertEqual(self.getUsers('sim/b'), [('ARM1', [2, 3]), ('OBJ2', [6])])
+        self.assertEqual(self.getUsers('sim/unused'), [])
+
+    def testIndices(self):
+        # every keyframe with a dataref is listed once, under its own dataref
+        store = self.model.keyframes
+        listed = []
+        for dataref in store.datarefs:
+            for owner, indices in self.model.getDatarefUsers(dataref):
+                self.assertTrue(all(store.datarefs[store.refs[i]] == dataref for i in indices))
+                listed.extend(indices)
+        self.assertEqual(sorted(listed), [i for i in range(len(store)) if store.refs[i] >= 0])
+
+
+class ProxyMeshTest(unittest.TestCase):
+    def assertEmptyProxy(self, useNumpy):
+        # a TRIS group with count 0 becomes an empty mesh in both proxy modes
+        model = parseText('''TRIS 0 0
+TRIS 0 3
+''', useNumpy)
+        empty, full = model.objects
+        for bounds in (True, False):
+            verts, normals, uv, faces = model.getProxyMeshData(empty, bounds)
+            self.assertEqual((len(verts), len(normals), len(uv), len(faces)), (0, 0, 0, 0))
+            verts, normals, uv, faces = model.getProxyMeshData(full, bounds)
+            self.assertEqual(len(faces), 12 if bounds else 1)
+
+    def testEmptyPython(self):
+        self.assertEmptyProxy(False)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def testEmptyNumpy(self):
+        self.assertEmptyProxy(True)
+
+
+if __name__ == '__main__':
+    unittest.main()
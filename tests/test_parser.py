@@ -0,0 +1,113 @@
+#---------------------------------------------------------------------------
+#
+#  Parser checks on small hand written OBJ8 snippets
+#
+#  python -m unittest discover tests
+#
+#---------------------------------------------------------------------------
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from xplane11import.parser import ObjParser
+from xplane11import.model import KEY_LOC
+
+HEADER = '''I
+800
+OBJ
+POINT_COUNTS 3 0 0 3
+VT 0 0 0 0 1 0 0 0
+VT 1 0 0 0 1 0 1 0
+VT 0 0 1 0 1 0 0 1
+IDX 0
+IDX 1
+IDX 2
+'''
+
+
+def parseText(text, useNumpy=False):
+    return ObjParser('test.obj', useNumpy).parse((HEADER + text).splitlines())
+
+
+class StaticTranslationTest(unittest.TestCase):
+    def assertStatic(self, model):
+        # the static translation has no dataref, the animated one keeps its own
+        store = model.keyframes
+        self.assertEqual(store.datarefs, ['sim/knob'])
+        locRefs = [store.refs[i] for i in range(len(store)) if store.types[i] == KEY_LOC]
+        self.assertEqual(locRefs[0], -1)
+        self.assertTrue(all(ref == -1 for ref in locRefs[:-2]))
+        self.assertEqual(locRefs[-2:], [0, 0])
+        self.assertNotIn('none', model.datarefUsers)
+        self.assertEqual(model.getDatarefUsers('none'), [])
+        self.assertEqual(len(model.getDatarefUsers('sim/knob')), 1)
+
+    def testShortForm(self):
+        # ANIM_trans x1 y1 z1 x2 y2 z2
+        self.assertStatic(parseText('''ANIM_begin
+ANIM_trans 1 2 3 1 2 3
+ANIM_trans 0 0 0 0 0 1 0 1 sim/knob
+TRIS 0 3
+ANIM_end
+'''))
+
+    def testNoneDataref(self):
+        # ANIM_trans x1 y1 z1 x2 y2 z2 0 0 none, as written by the exporters
+        self.assertStatic(parseText('''ANIM_begin
+ANIM_trans 1 2 3 1 2 3 0 0 none
+ANIM_trans 0 0 0 0 0 1 0 1 sim/knob
+TRIS 0 3
+ANIM_end
+'''))
+
+    def testNoneTable(self):
+        self.assertStatic(parseText('''ANIM_begin
+ANIM_trans_begin none
+ANIM_trans_key 0 1 2 3
+ANIM_trans_end
+ANIM_trans 0 0 0 0 0 1 0 1 sim/knob
+TRIS 0 3
+ANIM_end
+'''))
+
+
+class AttributeStateTest(unittest.TestCase):
+    def setUp(self):
+        self.model = parseText('''ATTR_LOD 0 1000
+ATTR_no_cull
+TRIS 0 3
+TRIS 0 3
+ATTR_blend 0.3
+TRIS 0 3
+ATTR_LOD 1000 5000
+TRIS 0 3
+TRIS 0 3
+ATTR_no_blend
+TRIS 0 3
+ATTR_reset
+TRIS 0 3
+''')
+
+    def testState(self):
+        states = [group.state for group in self.model.objects]
+        self.assertEqual(states[0], (('ATTR_LOD', '0', '1000'), ('ATTR_no_cull',)))
+        # the state carries over to the next TRIS, its ATTR_ lines don't
+        self.assertEqual(states[1], states[0])
+        self.assertEqual(self.model.objects[1].attr, [])
+        self.assertEqual(states[2], (('ATTR_LOD', '0', '1000'), ('ATTR_blend', '0.3'), ('ATTR_no_cull',)))
+        # a new LOD starts with the default state
+        self.assertEqual(states[3], (('ATTR_LOD', '1000', '5000'),))
+        self.assertEqual(states[5], (('ATTR_LOD', '1000', '5000'), ('ATTR_no_blend',)))
+        self.assertEqual(states[6], (('ATTR_LOD', '1000', '5000'),))
+
+    def testMergedGroups(self):
+        # never across LODs or blend modes
+        merged = [[group.id for group in groups] for groups in self.model.getMergedGroups()]
+        self.assertEqual(sorted(merged), [[0, 1], [3, 4, 6]])
+
+
+if __name__ == '__main__':
+    unittest.main()
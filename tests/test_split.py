@@ -0,0 +1,118 @@
+#---------------------------------------------------------------------------
+#
+#  The split parser must return exactly what the normal parser returns
+#
+#  python -m unittest discover tests
+#
+#  The size limits are lowered so small generated files are split into
+#  many pieces. Runs without Blender, with and without numpy.
+#
+#---------------------------------------------------------------------------
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+from generate import writeObj
+from xplane11import import split
+from xplane11import.parser import parseFile, numpy
+
+
+def getModelData(model):
+    # everything in the model as plain comparable values
+    arrays = model.getGeometryArrays()
+    store = model.keyframes
+    return {
+        'geometry': {name: bytes(values.tobytes()) for name, values in arrays.items()},
+        'keyframes': [bytes(values.tobytes()) for values in (store.types, store.values, store.angles, store.vectors, store.refs)],
+        'datarefs': list(store.datarefs),
+        'materials': [repr(mat) for mat in model.materials],
+        'objects': [(group.label, group.hasLabel, group.offset, group.count, group.mat, group.attr, list(group.kf.ranges)) for group in model.objects],
+        'armatures': [(block.label, block.parent.label if block.parent else None, list(block.kf.ranges), [(group.label, group.offset, group.count) for group in block.meshes]) for block in model.armatures],
+        'unknownCommands': dict(model.unknownCommands),
+    }
+
+
+class SplitParserTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.limits = (split.MIN_SPLIT_SIZE, split.PIECE_SIZE)
+        split.MIN_SPLIT_SIZE = 0
+        split.PIECE_SIZE = 1024
+
+    def tearDown(self):
+        split.MIN_SPLIT_SIZE, split.PIECE_SIZE = self.limits
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def writeObj(self, name, **kwargs):
+        # 3 * 7 * 13 indices, so the IDX section ends with single IDX lines
+        return writeObj(os.path.join(self.directory, name), verts=2000, groups=13, trisPerGroup=7, animDepth=2, keys=3, animEvery=3, **kwargs)
+
+    def assertSameModel(self, filepath, useNumpy):
+        expected = getModelData(parseFile(filepath, useNumpy))
+        result = getModelData(split.parseFileSplit(filepath, 2, useNumpy))
+        self.assertEqual(expected, result)
+
+    def testSplitPython(self):
+        self.assertSameModel(self.writeObj('split.obj'), False)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def testSplitNumpy(self):
+        self.assertSameModel(self.writeObj('split.obj'), True)
+
+    def testPieces(self):
+        # the pieces end at line ends and cover the VT and IDX sections exactly once
+        filepath = self.writeObj('pieces.obj', labels=False)
+        f = open(filepath, 'rb')
+        data = f.read()
+        f.close()
+        vtPieces, vtCounts, idxPieces, idxCounts, commands, pointCounts = split.findSections(data)
+        self.assertGreater(len(vtPieces), 1)
+        self.assertGreater(len(idxPieces), 1)
+        for pieces in (vtPieces, idxPieces):
+            for (start, end), (nextStart, nextEnd) in zip(pieces, pieces[1:]):
+                self.assertEqual(end, nextStart)
+                self.assertEqual(data[end - 1:end], b'\n')
+        self.assertEqual(pointCounts, (2000, 13 * 7 * 3))
+        self.assertEqual(sum(vtCounts), 2000 * split.VT_VALUES)
+        self.assertEqual(sum(idxCounts), 13 * 7 * 3)
+
+    def testTabs(self):
+        # XPlane2Blender separates the VT and IDX values with tabs
+        filepath = self.writeObj('tabs.obj')
+        f = open(filepath, 'r')
+        lines = f.read().splitlines()
+        f.close()
+        f = open(filepath, 'w')
+        for line in lines:
+            if(line.startswith('VT ') or line.startswith('IDX')):
+                line = '\t'.join(line.split())
+            f.write(line + '\n')
+        f.close()
+        f = open(filepath, 'rb')
+        self.assertIsNotNone(split.findSections(f.read()))
+        f.close()
+        self.assertSameModel(filepath, False)
+
+    def testWrongPointCounts(self):
+        # the arrays are sized from POINT_COUNTS, a file where it is wrong is parsed the normal way
+        filepath = self.writeObj('counts.obj')
+        f = open(filepath, 'r')
+        text = f.read()
+        f.close()
+        f = open(filepath, 'w')
+        f.write(text.replace('POINT_COUNTS 2000 ', 'POINT_COUNTS 1999 '))
+        f.close()
+        f = open(filepath, 'rb')
+        self.assertIsNone(split.findSections(f.read()))
+        f.close()
+        self.assertSameModel(filepath, False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#---------------------------------------------------------------------------
+#
+#  Import an X-Plane .obj file into Blender 2.8+
+#
+#  The parser and model modules do not depend on Blender, so this package
+#  can also be imported from plain Python to parse .obj files headless.
+#
+#---------------------------------------------------------------------------
+
+bl_info = {
+    "name": "Import X-Plane OBJ",
+    "author": "Tony Nemec - original script by David C. Prue",
+    "version": (0,1,1),
+    "blender": (2,80,0),
+    "api": 36273,
+    "location": "File > Import/Export > XPlane",
+    "description": "Import X-Plane obj",
+    "category": "Import-Export"
+}
+
+try:
+    import bpy
+except ImportError:
+    # running outside of Blender, only the parser is available
+    bpy = None
+
+if bpy is not None:
+    from .importer import xplane11import, xplane11import_load_full, menu_func, clearProxyModels
+    from .textures import clearTextureCache
+    from .materials import clearMaterialCache
+
+    @bpy.app.handlers.persistent
+    def clearSessionCaches(*args):
+        # the cached image and material names belong to the .blend file that was open
+        clearTextureCache()
+        clearMaterialCache()
+        clearProxyModels()
+
+    def register():
+        bpy.utils.register_class(xplane11import)
+        bpy.utils.register_class(xplane11import_load_full)
+        bpy.types.TOPBAR_MT_file_import.append(menu_func)
+        bpy.app.handlers.load_post.append(clearSessionCaches)
+
+    def unregister():
+        bpy.utils.unregister_class(xplane11import_load_full)
+        bpy.utils.unregister_class(xplane11import)
+        bpy.types.TOPBAR_MT_file_import.remove(menu_func)
+        if(clearSessionCaches in bpy.app.handlers.load_post):
+            bpy.app.handlers.load_post.remove(clearSessionCaches)
+        clearTextureCache()
+        clearMaterialCache()
+        clearProxyModels()
+
+    if __name__ == "__main__":
+        register()
+        #bpy.ops.object.xplane11import("INVOKE_DEFAULT")
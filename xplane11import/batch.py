@@ -0,0 +1,88 @@
+#---------------------------------------------------------------------------
+#
+#  Parse many .obj files in a process pool
+#
+#  Only the parsing runs in the workers, each one returns the ObjModel of
+#  a file. Blender datablocks can only be created in the main thread.
+#  Like the parser, this module does not need Blender.
+#
+#---------------------------------------------------------------------------
+
+import os
+from functools import partial
+
+from .split import parseFileSplit
+from .workers import createPool, reportPoolError, POOL_ERRORS
+from .cache import ModelCache, parseAndStore, DEFAULT_MAX_SIZE
+from .profiling import Profiler
+
+
+def findObjFiles(directory, recursive=False):
+    # all .obj files in a directory, sorted so imports are repeatable
+    filepaths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            if(name.lower().endswith('.obj')):
+                filepaths.append(os.path.join(root, name))
+        if(not recursive):
+            break
+    return filepaths
+
+
+def parseFiles(filepaths, maxWorkers=None, profile=False, cacheDir=None, cacheSize=DEFAULT_MAX_SIZE):
+    # yields (filepath, model) in the order of filepaths
+    # the models are returned as soon as they are parsed, so the caller can
+    # build the scene for one file while the workers parse the next ones
+    # maxWorkers: None for one worker per core, 1 to parse in this process
+    # profile: each model gets the parser timings in model.profile
+    # cacheDir: use the parsed model cache in this folder, '' for the default folder
+    # a single file is split over the workers instead, see split.py
+    if(cacheDir is None):
+        parse = partial(parseFileSplit, maxWorkers=maxWorkers if len(filepaths) == 1 else 1, profile=profile)
+        for item in parseUncached(filepaths, parse, maxWorkers):
+            yield item
+        return
+
+    # cache hits are loaded here, the arrays are memory-mapped and would be
+    # copied if they were sent from a worker process
+    cache = ModelCache(cacheDir or None, cacheSize)
+    cached = {}
+    for filepath in filepaths:
+        profiler = Profiler(profile)
+        with profiler.phase('cache load'):
+            model = cache.load(filepath)
+        if(model is not None):
+            profiler.count('cache hits')
+            profiler.finish()
+            model.profile = profiler if profile else None
+        cached[filepath] = model
+
+    misses = [filepath for filepath in filepaths if cached[filepath] is None]
+    fileKeys = {filepath: cache.fileKeys[filepath] for filepath in misses if filepath in cache.fileKeys}
+    parse = partial(parseAndStore, cacheDir=cache.directory, maxSize=cacheSize, profile=profile, maxWorkers=maxWorkers if len(misses) == 1 else 1, fileKeys=fileKeys)
+    parsed = parseUncached(misses, parse, maxWorkers)
+    for filepath in filepaths:
+        model = cached[filepath]
+        if(model is None):
+            model = next(parsed)[1]
+        yield filepath, model
+
+
+def parseUncached(filepaths, parse, maxWorkers):
+    pool = createPool(maxWorkers) if len(filepaths) >= 2 and maxWorkers != 1 else None
+    if(pool is None):
+        for filepath in filepaths:
+            yield filepath, parse(filepath)
+        return
+
+    done = 0
+    try:
+        with pool:
+            for model in pool.map(parse, filepaths):
+                yield filepaths[done], model
+                done += 1
+    except POOL_ERRORS as e:
+        reportPoolError(e)
+        for filepath in filepaths[done:]:
+            yield filepath, parse(filepath)
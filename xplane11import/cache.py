@@ -0,0 +1,237 @@
+#---------------------------------------------------------------------------
+#
+#  On-disk cache of parsed models
+#
+#  Every parsed file is stored as <content hash>.xpc, a container with the
+#  geometry and keyframe arrays and the rest of the model (anim tree, TRIS
+#  groups, materials) as JSON in its header, the same data the .xpc files
+#  of export.py have. Nothing in the cache is executed when it is read, the
+#  cache folder can be set by the user. A small <path hash>.json per .obj path remembers
+#  the mtime, size and content hash of the file it was parsed from, so an
+#  unchanged file is found without reading it. A touched file with the
+#  same content, or a copy of the file in another folder, is found by its
+#  content hash. The least recently used entries are removed when the
+#  cache grows over its size limit.
+#
+#  Like the parser, this module does not need Blender.
+#
+#---------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import sys
+
+from .container import writeContainer, readContainer
+from .model import ObjModel
+from .split import parseFileSplit
+from .profiling import Profiler
+
+# change this whenever ObjModel or its parts change, old entries are then ignored
+CACHE_VERSION = 8
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+
+def getDefaultCacheDir():
+    if(sys.platform == 'win32'):
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'xplane11import')
+
+
+def getFileHash(filepath):
+    digest = hashlib.sha1()
+    f = open(filepath, 'rb')
+    for chunk in iter(lambda: f.read(1 << 20), b''):
+        digest.update(chunk)
+    f.close()
+    return digest.hexdigest()
+
+
+class ModelCache:
+    def __init__(self, directory=None, maxSize=DEFAULT_MAX_SIZE):
+        self.directory = directory or getDefaultCacheDir()
+        self.maxSize = maxSize
+        # filepath -> (mtime, size, content hash) of the files load looked up,
+        # store uses it so a file that was not in the cache isn't hashed twice
+        self.fileKeys = {}
+        if(not os.path.isdir(self.directory)):
+            os.makedirs(self.directory, exist_ok=True)
+
+    def getPathEntry(self, filepath):
+        key = hashlib.sha1(os.path.abspath(filepath).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key + '.json')
+
+    def getDataPath(self, contentHash):
+        return os.path.join(self.directory, contentHash + '.xpc')
+
+    def readPathEntry(self, filepath):
+        try:
+            f = open(self.getPathEntry(filepath), 'r')
+            entry = json.load(f)
+            f.close()
+        except (OSError, ValueError):
+            return None
+        if(entry.get('version') != CACHE_VERSION):
+            return None
+        return entry
+
+    def writePathEntry(self, filepath, stat, contentHash):
+        entry = {'version': CACHE_VERSION, 'path': os.path.abspath(filepath), 'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': contentHash}
+        pathEntry = self.getPathEntry(filepath)
+        tempPath = pathEntry + '.tmp%d' % os.getpid()
+        f = open(tempPath, 'w')
+        json.dump(entry, f)
+        f.close()
+        os.replace(tempPath, pathEntry)
+
+    def load(self, filepath, useNumpy=None):
+        # returns the cached model of the file or None
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+
+        entry = self.readPathEntry(filepath)
+        isKnown = entry is not None and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size
+        if(isKnown):
+            contentHash = entry['hash']
+        else:
+            # the file was changed or never seen at this path, it may still have the same content
+            contentHash = getFileHash(filepath)
+        self.fileKeys[filepath] = (stat.st_mtime, stat.st_size, contentHash)
+
+        dataPath = self.getDataPath(contentHash)
+        if(not os.path.isfile(dataPath)):
+            return None
+        if(not isKnown):
+            self.writePathEntry(filepath, stat, contentHash)
+        try:
+            meta, arrays = readContainer(dataPath, useNumpy)
+            if(meta.get('version') != CACHE_VERSION):
+                return None
+            # the same content may have been parsed from another path
+            model = ObjModel(filepath)
+            model.setTree(meta['tree'])
+            model.setKeyframeArrays(arrays)
+            model.setGeometryArrays(arrays)
+            model.indexDatarefs()
+        except (OSError, ValueError, KeyError, TypeError, IndexError, AttributeError) as e:
+            print('Ignoring broken cache entry %s: %s' % (dataPath, e))
+            return None
+
+        try:
+            # mark the entry as recently used
+            os.utime(dataPath)
+        except OSError:
+            pass
+        return model
+
+    def store(self, filepath, model, fileKey=None):
+        # fileKey: (mtime, size, content hash) from load, the file is only hashed again if it changed since
+        stat = os.stat(filepath)
+        if(fileKey is not None and fileKey[:2] == (stat.st_mtime, stat.st_size)):
+            contentHash = fileKey[2]
+        else:
+            contentHash = getFileHash(filepath)
+
+        # the geometry and keyframes go into the container arrays, the rest of the model into the JSON header
+        arrays = model.getGeometryArrays()
+        arrays.update(model.getKeyframeArrays())
+        meta = {'version': CACHE_VERSION, 'source': os.path.abspath(filepath), 'tree': model.getTree()}
+        writeContainer(self.getDataPath(contentHash), arrays, meta)
+        self.writePathEntry(filepath, stat, contentHash)
+        self.evict()
+
+    def evict(self):
+        # remove the least recently used entries until the cache fits in maxSize
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if(not name.endswith('.xpc')):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append( (stat.st_mtime, stat.st_size, path) )
+            total += stat.st_size
+
+        entries.sort()
+        removed = 0
+        for mtime, size, path in entries:
+            if(total <= self.maxSize):
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                # still memory-mapped by an import on Windows
+                continue
+        if(removed):
+            self.removePathEntries()
+
+    def removePathEntries(self):
+        # remove the path entries of evicted data and of older cache versions
+        for name in os.listdir(self.directory):
+            if(not name.endswith('.json')):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                f = open(path, 'r')
+                entry = json.load(f)
+                f.close()
+            except (OSError, ValueError):
+                entry = None
+            if(entry is not None and entry.get('version') == CACHE_VERSION and os.path.isfile(self.getDataPath(entry.get('hash', '')))):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if(name.endswith('.xpc') or name.endswith('.json')):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+
+
+def parseFileCached(filepath, cacheDir=None, maxSize=DEFAULT_MAX_SIZE, useNumpy=None, profile=False, maxWorkers=1):
+    # parse a file, or load it from the cache if it was parsed before
+    # this is a plain function so it can run in the batch worker processes
+    # maxWorkers: split a large file over this many processes, None for one per core
+    cache = ModelCache(cacheDir, maxSize)
+    profiler = Profiler(profile)
+    with profiler.phase('cache load'):
+        model = cache.load(filepath, useNumpy)
+    if(model is not None):
+        profiler.count('cache hits')
+        profiler.finish()
+        model.profile = profiler if profile else None
+        return model
+
+    model = parseAndStore(filepath, cacheDir, maxSize, useNumpy, profile, maxWorkers, cache.fileKeys)
+    if(profile):
+        model.profile.merge(profiler)
+    return model
+
+
+def parseAndStore(filepath, cacheDir=None, maxSize=DEFAULT_MAX_SIZE, useNumpy=None, profile=False, maxWorkers=1, fileKeys=None):
+    # parse a file that is not in the cache and add it
+    # fileKeys: ModelCache.fileKeys of the lookup that missed, so the file isn't hashed again
+    model = parseFileSplit(filepath, maxWorkers, useNumpy, profile)
+    profiler = Profiler(profile)
+    try:
+        with profiler.phase('cache store'):
+            ModelCache(cacheDir, maxSize).store(filepath, model, (fileKeys or {}).get(filepath))
+    except OSError as e:
+        print('Could not write the cache: %s' % e)
+    if(profile):
+        model.profile.merge(profiler)
+    return model
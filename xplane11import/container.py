@@ -0,0 +1,115 @@
+#---------------------------------------------------------------------------
+#
+#  Binary container for raw arrays
+#
+#  Layout:
+#    8 bytes   magic 'XPOBJC01'
+#    4 bytes   header length, little endian
+#    header    JSON: {'meta': {...}, 'arrays': {name: {dtype, shape, offset, nbytes}}}
+#    arrays    raw little endian data, each one aligned to 16 bytes
+#
+#  With numpy the arrays are memory-mapped, so reading a container doesn't
+#  copy the data. Without numpy they are read into array.array buffers.
+#
+#---------------------------------------------------------------------------
+
+import json
+import os
+import struct
+import sys
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MAGIC = b'XPOBJC01'
+ALIGN = 16
+
+# array.array typecode <-> numpy dtype string
+DTYPES = {'f': '<f4', 'd': '<f8', 'i': '<i4', 'b': '|i1', 'B': '|u1'}
+TYPECODES = {dtype: typecode for typecode, dtype in DTYPES.items()}
+
+
+def getDtype(values):
+    if(hasattr(values, 'dtype')):
+        return values.dtype.newbyteorder('<').str
+    return DTYPES[values.typecode]
+
+
+def getBytes(values):
+    # raw little endian bytes without copying when possible
+    if(hasattr(values, 'dtype')):
+        return memoryview(numpy.ascontiguousarray(values, dtype=getDtype(values))).cast('B')
+    if(sys.byteorder != 'little' and values.itemsize > 1):
+        values = array(values.typecode, values)
+        values.byteswap()
+    return memoryview(values).cast('B')
+
+
+def writeContainer(filepath, arrays, meta):
+    # arrays: name -> numpy array or array.array
+    # written to a temp file first, so readers never see a half written container
+    blobs = []
+    header = {'meta': meta, 'arrays': {}}
+    offset = 0
+    for name, values in arrays.items():
+        data = getBytes(values)
+        shape = list(values.shape) if hasattr(values, 'shape') else [len(values)]
+        header['arrays'][name] = {'dtype': getDtype(values), 'shape': shape, 'offset': offset, 'nbytes': len(data)}
+        blobs.append(data)
+        offset += len(data)
+        offset += -offset % ALIGN
+
+    headerBytes = json.dumps(header).encode('utf-8')
+    start = len(MAGIC) + 4 + len(headerBytes)
+    padding = -start % ALIGN
+    dataStart = start + padding
+
+    tempPath = filepath + '.tmp%d' % os.getpid()
+    f = open(tempPath, 'wb')
+    f.write(MAGIC)
+    f.write(struct.pack('<I', len(headerBytes)))
+    f.write(headerBytes)
+    f.write(b'\0' * padding)
+    for name, data in zip(header['arrays'], blobs):
+        f.seek(dataStart + header['arrays'][name]['offset'])
+        f.write(data)
+    f.close()
+    os.replace(tempPath, filepath)
+
+
+def readHeader(f):
+    if(f.read(len(MAGIC)) != MAGIC):
+        raise ValueError('not an X-Plane object container')
+    headerLength = struct.unpack('<I', f.read(4))[0]
+    header = json.loads(f.read(headerLength).decode('utf-8'))
+    start = len(MAGIC) + 4 + headerLength
+    return header, start + (-start % ALIGN)
+
+
+def readContainer(filepath, useNumpy=None):
+    # returns (meta, arrays)
+    if(useNumpy is None):
+        useNumpy = numpy is not None
+    f = open(filepath, 'rb')
+    try:
+        header, dataStart = readHeader(f)
+        arrays = {}
+        for name, info in header['arrays'].items():
+            if(useNumpy):
+                if(info['nbytes'] == 0):
+                    arrays[name] = numpy.zeros(info['shape'], dtype=info['dtype'])
+                else:
+                    arrays[name] = numpy.memmap(filepath, dtype=info['dtype'], mode='r', offset=dataStart + info['offset'], shape=tuple(info['shape']))
+            else:
+                values = array(TYPECODES[info['dtype']])
+                f.seek(dataStart + info['offset'])
+                values.frombytes(f.read(info['nbytes']))
+                if(sys.byteorder != 'little' and values.itemsize > 1):
+                    values.byteswap()
+                arrays[name] = values
+    finally:
+        f.close()
+    return header['meta'], arrays
@@ -0,0 +1,215 @@
+#---------------------------------------------------------------------------
+#
+#  Write parsed models for tools that don't run Blender
+#
+#  python -m xplane11import.export -o out/ cockpit.obj          .xpc containers
+#  python -m xplane11import.export -o out/ --gltf *.obj         .gltf + .bin
+#
+#  The .xpc container (see container.py) has the raw vertex, index and
+#  keyframe arrays and a JSON tree with the TRIS groups, anim blocks,
+#  materials and datarefs. With numpy, readContainer maps the arrays
+#  without copying them.
+#
+#  The glTF file has one mesh per TRIS group and the anim blocks as nodes.
+#  All meshes share the vertex pool, each one only has its own index range.
+#  The X-Plane animations are driven by datarefs, so the keyframes with
+#  their dataref values are stored in the node extras instead of as glTF
+#  animations.
+#
+#  The arrays are written as they are, without a loop over the vertices.
+#
+#---------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import sys
+from array import array
+
+from .batch import parseFiles
+from .container import writeContainer, getBytes
+from .model import GEOMETRY, KEY_LOC, KEY_ROT, KEY_HIDE, KEY_SHOW, KEY_TYPES
+
+# rotates the Blender axes of the model (Z up) to the glTF axes (Y up)
+GLTF_ROOT_ROTATION = [-0.70710678, 0.0, 0.0, 0.70710678]
+
+# glTF constants
+GLTF_FLOAT = 5126
+GLTF_UNSIGNED_INT = 5125
+GLTF_ARRAY_BUFFER = 34962
+GLTF_ELEMENT_ARRAY_BUFFER = 34963
+
+
+def getKeyframeList(kf):
+    # the keyframes themselves as JSON compatible data, for files without the kf arrays
+    # positions and axes are in Blender axes like the vertex pool
+    store = kf.store
+    keys = []
+    for i in kf.indices():
+        kfType = store.types[i]
+        key = {'type': KEY_TYPES[kfType], 'dataref': store.datarefs[store.refs[i]] if store.refs[i] >= 0 else None}
+        if(kfType == KEY_LOC):
+            key['value'] = store.values[i]
+            key['position'] = list(store.vectors[3 * i:3 * i + 3])
+        elif(kfType == KEY_ROT):
+            key['value'] = store.values[i]
+            key['axis'] = list(store.vectors[3 * i:3 * i + 3])
+            key['angle'] = store.angles[i]
+        elif(kfType == KEY_HIDE or kfType == KEY_SHOW):
+            key['v1'] = store.values[i]
+            key['v2'] = store.angles[i]
+        else:
+            key['value'] = store.values[i]
+        keys.append(key)
+    return keys
+
+
+def writeModelContainer(filepath, model):
+    # raw geometry and keyframe arrays plus the JSON anim tree
+    arrays = model.getGeometryArrays()
+    arrays.update(model.getKeyframeArrays())
+    meta = {'format': 'xplane11import-model', 'version': 1, 'source': os.path.abspath(model.filepath), 'tree': model.getTree()}
+    writeContainer(filepath, arrays, meta)
+
+
+def getFlippedUvs(uv):
+    # glTF has the UV origin at the top left, X-Plane at the bottom left
+    if(hasattr(uv, 'reshape')):
+        flipped = uv.copy()
+        flipped[:, 1] = 1.0 - flipped[:, 1]
+        return flipped.ravel()
+    # without numpy the pool is a list of tuples, it has to be copied anyway
+    return array('f', [value for u, v in uv for value in (u, 1.0 - v)])
+
+
+def getBounds(verts):
+    # POSITION accessors need the min and max of every axis
+    if(hasattr(verts, 'min')):
+        return verts.min(axis=0).tolist(), verts.max(axis=0).tolist()
+    axes = list(zip(*verts))
+    return [min(axis) for axis in axes], [max(axis) for axis in axes]
+
+
+def writeGltf(filepath, model):
+    # filepath.gltf and a .bin buffer next to it
+    arrays = model.getGeometryArrays()
+    arrays['uv'] = getFlippedUvs(model.uv)
+    binPath = os.path.splitext(filepath)[0] + '.bin'
+
+    # buffer views: positions, normals, uvs, indices, each aligned to 4 bytes
+    gltf = {'asset': {'version': '2.0', 'generator': 'xplane11import'}, 'buffers': [], 'bufferViews': [], 'accessors': []}
+    blobs = []
+    offset = 0
+    for name, typecode, width in GEOMETRY:
+        data = getBytes(arrays[name])
+        view = {'buffer': 0, 'byteOffset': offset, 'byteLength': len(data)}
+        view['target'] = GLTF_ELEMENT_ARRAY_BUFFER if name == 'faces' else GLTF_ARRAY_BUFFER
+        gltf['bufferViews'].append(view)
+        blobs.append(data)
+        offset += len(data)
+
+    numVerts = len(model.verts)
+    if(numVerts):
+        low, high = getBounds(model.verts)
+        gltf['accessors'].append({'bufferView': 0, 'componentType': GLTF_FLOAT, 'count': numVerts, 'type': 'VEC3', 'min': low, 'max': high})
+        gltf['accessors'].append({'bufferView': 1, 'componentType': GLTF_FLOAT, 'count': numVerts, 'type': 'VEC3'})
+        gltf['accessors'].append({'bufferView': 2, 'componentType': GLTF_FLOAT, 'count': numVerts, 'type': 'VEC2'})
+    gltf['buffers'].append({'uri': os.path.basename(binPath), 'byteLength': offset})
+
+    # textures are referenced where they are, relative to the .gltf
+    objDirectory = os.path.dirname(os.path.abspath(model.filepath))
+    gltfDirectory = os.path.dirname(os.path.abspath(filepath))
+    if(len(model.materials)):
+        gltf['images'] = [{'uri': os.path.relpath(os.path.join(objDirectory, mat.diffuse.replace('\\', '/')), gltfDirectory).replace(os.sep, '/')} for mat in model.materials]
+        gltf['textures'] = [{'source': index} for index in range(len(model.materials))]
+        gltf['materials'] = [{'name': mat.diffuse.split('.')[0], 'pbrMetallicRoughness': {'baseColorTexture': {'index': index}, 'metallicFactor': 0.0}} for index, mat in enumerate(model.materials)]
+
+    gltf['meshes'] = []
+    gltf['nodes'] = [{'name': os.path.splitext(os.path.basename(model.filepath))[0], 'rotation': GLTF_ROOT_ROTATION, 'children': []}]
+    datarefs = model.keyframes.datarefs
+
+    def getExtras(kf, attr=()):
+        store = kf.store
+        refs = sorted(set(store.refs[i] for i in kf.indices() if store.refs[i] >= 0))
+        # the kf arrays are not in the .bin, so the keyframes are written out in full
+        return {'datarefs': [datarefs[ref] for ref in refs], 'keyframes': getKeyframeList(kf), 'attributes': [' '.join(attribute) for attribute in attr]}
+
+    def addMeshNode(group, translation):
+        # a primitive with the index range of the group, the vertex accessors are shared
+        gltf['accessors'].append({'bufferView': 3, 'byteOffset': group.offset * 4, 'componentType': GLTF_UNSIGNED_INT, 'count': group.count, 'type': 'SCALAR'})
+        primitive = {'attributes': {'POSITION': 0, 'NORMAL': 1, 'TEXCOORD_0': 2}, 'indices': len(gltf['accessors']) - 1}
+        if(group.mat is not None):
+            primitive['material'] = group.mat
+        gltf['meshes'].append({'name': group.label, 'primitives': [primitive]})
+        node = {'name': group.label, 'mesh': len(gltf['meshes']) - 1, 'extras': getExtras(group.kf, group.attr)}
+        if(translation is not None):
+            node['translation'] = translation
+        gltf['nodes'].append(node)
+        return len(gltf['nodes']) - 1
+
+    # the anim blocks are placed at their rotation origin like the Blender armatures,
+    # the meshes in them are moved back so the vertex pool can be used as it is
+    blockNodes = {}
+    for block in model.armatures:
+        origin = block.kf.getOrigins()[1]
+        parentOrigin = block.parent.kf.getOrigins()[1] if block.parent is not None else (0.0, 0.0, 0.0)
+        node = {'name': block.label, 'translation': [origin[i] - parentOrigin[i] for i in range(3)], 'children': [], 'extras': getExtras(block.kf)}
+        gltf['nodes'].append(node)
+        blockNodes[block] = len(gltf['nodes']) - 1
+        if(numVerts):
+            for group in block.meshes:
+                node['children'].append(addMeshNode(group, [-value for value in origin]))
+    for block in model.armatures:
+        parent = blockNodes[block.parent] if block.parent is not None else 0
+        gltf['nodes'][parent]['children'].append(blockNodes[block])
+    if(numVerts):
+        for group in model.objects:
+            gltf['nodes'][0]['children'].append(addMeshNode(group, None))
+
+    for node in gltf['nodes']:
+        if('children' in node and len(node['children']) == 0):
+            del node['children']
+    gltf['scenes'] = [{'nodes': [0]}]
+    gltf['scene'] = 0
+
+    f = open(binPath, 'wb')
+    for view, data in zip(gltf['bufferViews'], blobs):
+        f.seek(view['byteOffset'])
+        f.write(data)
+    f.close()
+    f = open(filepath, 'w')
+    json.dump(gltf, f)
+    f.close()
+
+
+def exportFiles(filepaths, directory, gltf=False, maxWorkers=None):
+    # parse the files in parallel and write one output file per .obj
+    # returns the paths of the written files
+    if(not os.path.isdir(directory)):
+        os.makedirs(directory)
+    written = []
+    for filepath, model in parseFiles(filepaths, maxWorkers):
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        if(gltf):
+            outputPath = os.path.join(directory, name + '.gltf')
+            writeGltf(outputPath, model)
+        else:
+            outputPath = os.path.join(directory, name + '.xpc')
+            writeModelContainer(outputPath, model)
+        written.append(outputPath)
+    return written
+
+
+def main():
+    argParser = argparse.ArgumentParser(description='Export X-Plane .obj files without Blender')
+    argParser.add_argument('filepaths', nargs='+')
+    argParser.add_argument('-o', '--output', default='.', help='output folder')
+    argParser.add_argument('--gltf', action='store_true', help='write .gltf and .bin files instead of .xpc containers')
+    argParser.add_argument('--workers', type=int, help='number of parser processes, default one per core')
+    args = argParser.parse_args()
+    for outputPath in exportFiles(args.filepaths, args.output, args.gltf, args.workers):
+        print(outputPath)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,931 @@
+#---------------------------------------------------------------------------
+#
+#  Import an X-Plane .obj file into Blender 2.78
+#
+# Dave Prue <dave.prue@lahar.net>
+#
+# MIT License
+#
+# Copyright (c) 2017 David C. Prue
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+#---------------------------------------------------------------------------    
+
+# Last Changes: July 2020
+
+# imports obj format up to X-Plane 11 into Blender 2.8+
+# Tested with Blender 2.83
+
+# This script adds the X-plane OBJ formatted aircraft files into the File -> Import menu
+# It will create a new collection and all the mesh data and attempt to add animation keyframes
+
+# Install the latest Xplane2Blender plugin to be able to import X-Plane features in addition to the mesh data.
+
+# Orginal script: https://github.com/daveprue/XPlane2Blender
+
+
+
+
+import bpy
+import bmesh
+import math
+import mathutils
+from mathutils import Vector, Euler
+import hashlib
+import itertools
+import os
+import tempfile
+import time
+from array import array
+
+from .batch import findObjFiles, parseFiles
+from .model import TrisGroup, Keyframes, KeyframeStore, KEY_LOC, KEY_ROT, KEY_HIDE, KEY_SHOW, KEY_LOOP, KEY_TYPES
+from .parser import parseFile
+from .materials import getMaterial, getBlendMode
+from .profiling import Profiler
+
+# custom properties on the imported objects, used to update them on a re-import
+IMPORT_KEY = 'xplane11import_key'
+IMPORT_FINGERPRINT = 'xplane11import_fingerprint'
+# custom properties on placeholder objects, used to load their full geometry
+PROXY_SOURCE = 'xplane11import_proxy_source'
+PROXY_RANGE = 'xplane11import_proxy_range'
+PROXY_SHIFT = 'xplane11import_proxy_shift'
+# hash of the TRIS range and vertex pool, the file must still have the same geometry
+PROXY_HASH = 'xplane11import_proxy_hash'
+
+# .obj path -> parsed model of the files imported with placeholders in this session
+# the full geometry of a placeholder is taken from its TRIS range in these pools
+proxyModels = {}
+
+
+class xplane11import(bpy.types.Operator):
+    bl_label = "Import X-Plane OBJ"
+    bl_idname = "object.xplane11import"
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    # multiple files can be selected in the file browser
+    files: bpy.props.CollectionProperty(type=bpy.types.OperatorFileListElement, options={'HIDDEN', 'SKIP_SAVE'})
+    directory: bpy.props.StringProperty(subtype="DIR_PATH", options={'HIDDEN', 'SKIP_SAVE'})
+    filter_glob: bpy.props.StringProperty(default="*.obj", options={'HIDDEN'})
+
+    use_directory: bpy.props.BoolProperty(name="Whole Folder", description="Import all .obj files in the folder", default=False)
+    use_recursive: bpy.props.BoolProperty(name="Include Subfolders", description="Also import .obj files from subfolders of the folder", default=False)
+    use_parallel: bpy.props.BoolProperty(name="Parse in Parallel", description="Parse multiple files in separate processes", default=True)
+    use_profile: bpy.props.BoolProperty(name="Profile Import", description="Measure the time of each import phase and write a JSON report", default=False)
+    profile_filepath: bpy.props.StringProperty(name="Profile Report", description="JSON file for the profile report, the temp folder is used if empty", subtype="FILE_PATH", default="")
+    use_cache: bpy.props.BoolProperty(name="Use Cache", description="Keep parsed files in a cache, unchanged files are not parsed again", default=False)
+    cache_directory: bpy.props.StringProperty(name="Cache Folder", description="Folder for the parse cache, the user cache folder is used if empty", subtype="DIR_PATH", default="")
+    proxy_mode: bpy.props.EnumProperty(name="Geometry", description="Build the full meshes or light placeholders, the full geometry of selected placeholders can be loaded later", items=(
+        ('FULL', "Full", "Build the full meshes"),
+        ('BOUNDS', "Bounding Boxes", "Build a bounding box for each object"),
+        ('DECIMATED', "Decimated", "Build each object from a subset of its triangles"),
+    ), default='FULL')
+    proxy_faces: bpy.props.IntProperty(name="Placeholder Faces", description="Maximum number of triangles of a decimated placeholder", default=100, min=1)
+    use_merge: bpy.props.BoolProperty(name="Merge Static Objects", description="Merge the objects without animation that have the same material and attributes into one mesh, the labels become vertex groups", default=False)
+    use_reimport: bpy.props.BoolProperty(name="Update Existing", description="Update the collection of an earlier import of the file and only rebuild the objects that changed", default=False)
+
+
+    def getFilepaths(self):
+        # the files to import, from the file browser selection or the whole folder
+        directory = self.directory or os.path.dirname(self.filepath)
+        if(self.use_directory):
+            return findObjFiles(directory, self.use_recursive)
+        filepaths = [os.path.join(directory, f.name) for f in self.files if f.name]
+        if(len(filepaths) == 0):
+            filepaths = [self.filepath]
+        return filepaths
+
+    def execute(self, context):
+        filepaths = self.getFilepaths()
+        self.profiler = Profiler(self.use_profile)
+        numObj = 0
+        # parsing runs in worker processes, the Blender objects are created here
+        # 'parse wait' is the time the import waits for the workers
+        # a cache hit skips the parser, cacheDir '' is the default cache folder
+        cacheDir = None
+        if(self.use_cache):
+            cacheDir = bpy.path.abspath(self.cache_directory) if self.cache_directory else ''
+        models = parseFiles(filepaths, None if self.use_parallel else 1, self.use_profile, cacheDir)
+        for filepath, model in self.profiler.timedIter('parse wait', models):
+            self.profiler.merge(model.profile)
+            numObj += self.importModel(filepath, model)
+        print('Imported %d objects from %d files' % (numObj, len(filepaths)))
+
+        if(self.use_profile):
+            self.writeProfile()
+        return {"FINISHED"}
+
+    def writeProfile(self):
+        self.profiler.finish()
+        reportPath = self.profile_filepath or os.path.join(tempfile.gettempdir(), 'xplane11import_profile.json')
+        self.profiler.writeReport(bpy.path.abspath(reportPath))
+        summary = self.profiler.getSummary()
+        for line in summary:
+            print(line)
+        # the parser phases are the sum over all files, they overlap when parsed in parallel
+        self.report({'INFO'}, 'Import profile: ' + ', '.join(summary[:12]) + ' (report: %s)' % reportPath)
+
+    def importModel(self, filepath, model):
+        global collection
+        print("execute %s" % filepath)
+        # create new collection to match filename
+        collName = os.path.splitext(os.path.basename(filepath))[0]
+        collection = None
+        if(self.use_reimport and collName in bpy.context.scene.collection.children):
+            # update the collection of an earlier import
+            collection = bpy.context.scene.collection.children[collName]
+        if(collection is None):
+            collection = bpy.data.collections.new(collName)
+            bpy.context.scene.collection.children.link(collection)
+            # any time the xplane class is used, that code requires having the Xplane2Blender plugin enabled
+            try:
+                # name the xplane layer/collection property in the scene properties window
+                collection.xplane.layer.name = collName
+                # make this a root collection so it can be exported
+                collection.xplane.is_exportable_collection = True
+            except:
+                print
+
+        # do the import      
+        numObj = self.run((0,0,0), model)
+        print('Imported %d objects' % numObj)
+        return numObj
+    
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {"RUNNING_MODAL"}
+
+    def getMessage(self, messageType):
+        if(messageType == 'dataref'):
+            return 'Failed to create XPlane dataref. Make sure you have the XPlane2Blender plugin enabled.'
+        if(messageType == 'xplane'):
+            return 'If have the XPlane2Blender plugin enabled, you can enable many more features.'
+        return ''
+
+
+    def hasXPlaneLayout(self):
+        # True if the XPlane2Blender object properties have the layout we know,
+        # then datarefs and attributes are written directly instead of using its operators
+        xplane = bpy.types.Object.bl_rna.properties.get('xplane')
+        if(xplane is None):
+            return False
+        props = xplane.fixed_type.properties
+        if('datarefs' not in props or 'customAttributes' not in props):
+            return False
+        datarefProps = props['datarefs'].fixed_type.properties
+        attributeProps = props['customAttributes'].fixed_type.properties
+        return all(name in datarefProps for name in ('path', 'value', 'anim_type', 'show_hide_v1', 'show_hide_v2', 'loop')) and all(name in attributeProps for name in ('name', 'value'))
+
+    def addDatarefKeyframe(self, ob, index, frame, datarefKeys, value):
+        # key the value of the dataref at this frame
+        if(self.directXPlane):
+            # written as F-curves at the end of createKeyframes
+            datarefKeys.setdefault(index, []).append( (frame, (value,)) )
+        else:
+            # the operator keys the current value at the current frame of the active object
+            ob.xplane.datarefs[index].value = value
+            bpy.context.scene.frame_current = frame
+            bpy.context.view_layer.objects.active = ob
+            bpy.ops.object.add_xplane_dataref_keyframe(index=index)
+
+    def addCustomAttribute(self, ob):
+        if(self.directXPlane):
+            return ob.xplane.customAttributes.add()
+        # the operator adds the attribute to the active object
+        bpy.context.view_layer.objects.active = ob
+        bpy.ops.object.add_xplane_object_attribute()
+        return ob.xplane.customAttributes[-1]
+
+    def createFCurves(self, ob, dataPath, keys, group='Object Transforms'):
+        # keys = [(frame, (x, y, z)), ...]
+        # one F-curve per component, the keyframe points are filled in bulk
+        if(len(keys) == 0):
+            return
+
+        if(ob.animation_data is None):
+            ob.animation_data_create()
+        action = ob.animation_data.action
+        if(action is None):
+            action = bpy.data.actions.new(ob.name + 'Action')
+            ob.animation_data.action = action
+
+        for index in range(len(keys[0][1])):
+            fcurve = action.fcurves.find(dataPath, index=index)
+            if(fcurve is None):
+                fcurve = action.fcurves.new(dataPath, index=index, action_group=group)
+            fcurve.keyframe_points.add(len(keys))
+            fcurve.keyframe_points.foreach_set('co', array('f', itertools.chain.from_iterable((frame, value[index]) for frame, value in keys)))
+            # sorts the points and calculates the auto handles
+            fcurve.update()
+
+        # show the first keyframe, the same as evaluating frame 1
+        owner = ob
+        prop = dataPath
+        if('.' in dataPath):
+            # a nested property like xplane.datarefs[0].value
+            ownerPath, prop = dataPath.rsplit('.', 1)
+            owner = ob.path_resolve(ownerPath)
+        value = keys[0][1]
+        setattr(owner, prop, value if len(value) > 1 else value[0])
+
+    def createKeyframes(self, obKeyframes, ob):
+        # obKeyframes: model.Keyframes, the keyframe data is read from the arrays of its store
+        store = obKeyframes.store
+        types, values, angles, vectors, refs, datarefs = store.types, store.values, store.angles, store.vectors, store.refs, store.datarefs
+        curFrame = 1
+        # the datarefs are interned, so they are compared by their index in the store
+        dataref = -1
+        dataref_index = 0
+        # the keyframes are collected and written as F-curves at the end
+        locKeys = []
+        rotKeys = []
+        # dataref index -> keys
+        datarefKeys = {}
+        for i in obKeyframes.indices():
+            frame = curFrame
+            kfType = types[i]
+            if(kfType == KEY_LOC):
+                if(refs[i] < 0):
+                    # don't create a keyframe for a translation without a dataref
+                    continue
+
+                # first create the Blender keyframe
+                locKeys.append( (frame, tuple(vectors[3 * i:3 * i + 3])) )
+
+                curFrame += 2
+
+                try:
+                    # add the xplane dataref
+                    if(dataref != refs[i]):
+                        dataref = refs[i]
+                        # add only once as long as the dataref doesn't change
+                        ob.xplane.datarefs.add()
+                        dataref_index = len(ob.xplane.datarefs) -1
+                        ob.xplane.datarefs[dataref_index].path = datarefs[dataref]
+
+                    # add the xplane dataref keyframe with the dataref value
+                    self.addDatarefKeyframe(ob, dataref_index, frame, datarefKeys, values[i])
+                except Exception as e:
+                    print(self.getMessage('dataref'))
+                    print(e)
+
+            elif(kfType == KEY_ROT):
+                # create the Blender keyframe
+                try:
+                    axis = vectors[3 * i:3 * i + 3]
+                    # Euler rotation is in radians
+                    angleRad = math.radians(angles[i])
+                    # multiply the axis with the angle to get the euler rotation
+                    # probably a cleaner way to do this
+                    euler = ( (axis[0] * angleRad), (axis[1] * angleRad), (axis[2] * angleRad) )
+                    rotKeys.append( (frame, euler) )
+                    curFrame += 2
+
+                    try:
+                        # add the xplane dataref
+                        if(dataref != refs[i]):
+                            dataref = refs[i]
+                            # add only once as long as the dataref doesn't change
+                            ob.xplane.datarefs.add()
+                            dataref_index = len(ob.xplane.datarefs) -1
+                            ob.xplane.datarefs[dataref_index].path = datarefs[dataref]
+
+                        # add the xplane dataref keyframe with the dataref value
+                        self.addDatarefKeyframe(ob, dataref_index, frame, datarefKeys, values[i])
+                    except Exception as e:
+                        print(self.getMessage('dataref'))
+                        print(e)
+
+                except Exception as e:
+                    print(e)
+
+            elif(kfType == KEY_HIDE or kfType == KEY_SHOW):
+                # values = v1, angles = v2
+                try:
+                    dataref = refs[i]
+                    ob.xplane.datarefs.add()
+                    dataref_index = len(ob.xplane.datarefs) -1
+                    ob.xplane.datarefs[dataref_index].path = datarefs[dataref]
+                    ob.xplane.datarefs[dataref_index].anim_type = KEY_TYPES[kfType]
+                    # set two dataref values
+                    ob.xplane.datarefs[dataref_index].show_hide_v1 = values[i]
+                    ob.xplane.datarefs[dataref_index].show_hide_v2 = angles[i]
+                except Exception as e:
+                    print(self.getMessage('dataref'))
+                    print(e)
+
+            elif(kfType == KEY_LOOP):
+                # not really a keyframe, this just sets the loop value
+                ob.xplane.datarefs[dataref_index].loop = values[i]
+
+            # end kf loop
+
+        self.createFCurves(ob, 'location', locKeys)
+        self.createFCurves(ob, 'rotation_euler', rotKeys)
+        for index, keys in datarefKeys.items():
+            # same path and group as the XPlane2Blender keyframe operator uses
+            self.createFCurves(ob, 'xplane.datarefs[%d].value' % index, keys, 'XPlane Datarefs')
+
+        if(not self.directXPlane):
+            bpy.context.scene.frame_current = 1
+        return 1
+
+    def createArmature(self, name, origin):
+        #Create armature and armature object
+        arm = bpy.data.armatures.new( name + 'Arm')
+        arm.display_type = 'STICK'
+        ob = bpy.data.objects.new( name , arm)
+        # armature bone should be located at the rotation origin
+        ob.location =  origin
+        #Link armature object to our collection
+        self.linkObject(ob)
+
+        # the bone is added later by createBones, together with all other armatures
+        return ob
+
+    def createBones(self, armatureObjects):
+        # bones can only be created in edit mode
+        # enter it once for all armatures instead of once per armature
+        if(len(armatureObjects) == 0):
+            return
+
+        view_layer = bpy.context.view_layer
+        for ob in armatureObjects:
+            ob.select_set(True)
+        view_layer.objects.active = armatureObjects[0]
+        bpy.ops.object.mode_set(mode='EDIT', toggle=False)
+
+        for ob in armatureObjects:
+            #Make a bone - locate it at the rotation origin
+            bone = ob.data.edit_bones.new('Bone')
+            bone.head = (0,0,0)
+            bone.tail = (0,0.2,0)
+
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        for ob in armatureObjects:
+            ob.pose.bones["Bone"].rotation_mode = 'XYZ'
+    
+    def flatBuffer(self, seq, typecode):
+        # foreach_set wants a flat buffer, numpy arrays from the parser can be used directly
+        if(hasattr(seq, 'ravel')):
+            return seq.ravel()
+        return array(typecode, itertools.chain.from_iterable(seq))
+
+    def fillMesh(self, me, verts, faces, uvs, normals):
+        # fill the mesh from flat buffers with a few foreach_set calls
+        # instead of setting each vertex and loop from Python
+        numVerts = len(verts)
+        numFaces = len(faces)
+        numLoops = numFaces * 3
+
+        # every face is a triangle, so the loops are just the flattened faces
+        loopVerts = self.flatBuffer(faces, 'i')
+
+        me.vertices.add(numVerts)
+        me.vertices.foreach_set('co', self.flatBuffer(verts, 'f'))
+
+        me.loops.add(numLoops)
+        me.loops.foreach_set('vertex_index', loopVerts)
+
+        me.polygons.add(numFaces)
+        me.polygons.foreach_set('loop_start', array('i', range(0, numLoops, 3)))
+        if(bpy.app.version < (3, 6, 0)):
+            # loop_total is computed from loop_start in newer versions
+            me.polygons.foreach_set('loop_total', array('i', [3]) * numFaces)
+        # shade smooth
+        me.polygons.foreach_set('use_smooth', [True] * numFaces)
+
+        # Update mesh with new data
+        me.update(calc_edges=True)
+
+        # Create uv layer, the uvs are stored per loop
+        uvlayer = me.uv_layers.new()
+        me.uv_layers.active = uvlayer
+        if(hasattr(uvs, 'ravel')):
+            loopUvs = uvs[loopVerts].ravel()
+        else:
+            loopUvs = array('f', itertools.chain.from_iterable(uvs[i] for i in loopVerts))
+        uvlayer.data.foreach_set('uv', loopUvs)
+
+        # Assign the normals from the obj as custom split normals
+        if(bpy.app.version < (4, 1, 0)):
+            # custom normals are only used with auto smooth before 4.1
+            me.use_auto_smooth = True
+        me.normals_split_custom_set_from_vertices(normals)
+
+        return me
+
+    def createMesh(self, name, origin, verts, faces, mat, uvs, normals, attr, me=None):
+        # Create mesh and object
+        # if an existing mesh is passed in, the object becomes a linked duplicate
+        isNewMesh = me is None
+        if(isNewMesh):
+            me = bpy.data.meshes.new(name+'Mesh')
+        ob = bpy.data.objects.new(name, me)
+        #ob.location = Vector((0,0,0))
+        ob.location = origin
+        ob.show_name = False
+        
+        # Link object to collection
+        self.linkObject(ob)
+
+        if(isNewMesh):
+            # Create mesh from given verts, faces, uvs and normals
+            self.fillMesh(me, verts, faces, uvs, normals)
+
+        if(mat and isNewMesh):
+            # Assign material to object
+            ob.data.materials.append(mat)
+
+        for attribute in attr:
+            # add custom attributes
+            # this is the raw string from the parser
+            try:
+                customAttribute = self.addCustomAttribute(ob)
+                customAttribute.name = attribute[0]
+                customAttribute.value = ' '.join(attribute[1:])
+            except Exception as e:
+                print(e)
+
+        return ob
+
+    def getOrigins(self, keyframes):
+        # if the animation contains rotation, the rotation origin may be different
+        # [sum of all translations, rotation origin]
+        origin, rotOrigin = keyframes.getOrigins()
+        return [Vector(origin), Vector(rotOrigin)]
+
+    def getFirstLocation(self, keyframes, rotOrigin):
+        # the location createKeyframes leaves an armature at: its first location key,
+        # or the rotation origin it was created at if it has no location keys
+        store = keyframes.store
+        for i in keyframes.indices():
+            if(store.types[i] == KEY_LOC and store.refs[i] >= 0):
+                return Vector(store.vectors[3 * i:3 * i + 3])
+        return rotOrigin.copy()
+
+    def getMeshMedian(self, obj):
+        obj.update_from_editmode()
+        me = obj.data
+        verts_sel = [v.co for v in me.vertices]
+        pivot = sum(verts_sel, Vector()) / len(verts_sel)
+        return pivot
+
+    def transformMeshOrigin(self, ob, origin):
+        # used to move the mesh origin
+        ob.data.transform(mathutils.Matrix.Translation(-origin))
+        return
+
+    def translateObject(self, ob, location):
+        # used to move the entire object position
+        # the object has no parent yet, so this is the same as moving matrix_world
+        # but doesn't need an evaluated matrix
+        ob.location += location
+        return
+
+    def getImportedObjects(self):
+        # match key -> object for the objects of an earlier import in the collection
+        # objects added by the user have no key and are left alone
+        return {ob[IMPORT_KEY]: ob for ob in collection.objects if IMPORT_KEY in ob}
+
+    def getGeometryHash(self, group):
+        # the geometry part of the fingerprint of a TRIS group
+        # full meshes are compacted and hashed, placeholders only hash their raw index range
+        meshHash = self.meshHashes.get(group)
+        if(meshHash is None):
+            if(self.proxy_mode == 'FULL' or group in self.merged):
+                meshHash = self.model.getMeshHash(self.model.getMeshData(group))
+            else:
+                if(self.poolHash is None):
+                    self.poolHash = self.model.getPoolHash()
+                meshHash = self.model.getRangeHash(group, self.poolHash)
+            self.meshHashes[group] = meshHash
+        return meshHash
+
+    def getFingerprints(self, model, mergedGroups):
+        # TRIS group, tuple of merged TRIS groups or anim block -> (match key, fingerprint)
+        fingerprints = model.getFingerprints(self.getGeometryHash)
+        if(self.proxy_mode != 'FULL'):
+            # a re-import with full geometry replaces the placeholders
+            fingerprints = {item: (key, fingerprint + ' ' + self.proxy_mode) for item, (key, fingerprint) in fingerprints.items()}
+        for groups in mergedGroups:
+            # matched by the first group, changes to any of them rebuild the object
+            key = 'MERGED ' + fingerprints[groups[0]][0]
+            fingerprint = hashlib.sha1(' '.join(fingerprints.pop(group)[1] for group in groups).encode('utf-8')).hexdigest()
+            fingerprints[groups] = (key, fingerprint)
+        return fingerprints
+
+    def tagObject(self, ob, fingerprint):
+        # remember what the object was built from for the next re-import
+        ob[IMPORT_KEY], ob[IMPORT_FINGERPRINT] = fingerprint
+
+    def removeObjects(self, objects):
+        # remove objects of an earlier import and the data only they used
+        for ob in objects:
+            data = ob.data
+            action = ob.animation_data.action if ob.animation_data else None
+            bpy.data.objects.remove(ob, do_unlink=True)
+            if(data is not None and data.users == 0):
+                if(isinstance(data, bpy.types.Mesh)):
+                    bpy.data.meshes.remove(data)
+                elif(isinstance(data, bpy.types.Armature)):
+                    bpy.data.armatures.remove(data)
+            if(action is not None and action.users == 0):
+                bpy.data.actions.remove(action)
+
+    def linkObject(self, ob):
+        if(self.deferLinking):
+            # linked in one pass by linkPendingObjects
+            self.pendingObjects.append(ob)
+        else:
+            collection.objects.link(ob)
+
+    def linkPendingObjects(self, layerCollection):
+        # link everything while the collection is excluded from the view layer,
+        # so the view layer is synced once instead of once per object
+        layerCollection.exclude = True
+        for ob in self.pendingObjects:
+            collection.objects.link(ob)
+        self.pendingObjects = []
+        layerCollection.exclude = False
+
+    def addChild(self, objParent, obj,):
+        try:
+            obj.parent = objParent
+            return objParent
+        except Exception as e:
+            print('failed to parent object: ')
+            print(objParent)
+            print(e)
+
+        return ()
+
+
+    def createBlenderObject(self, obj, shift=None):
+        # obj = {label', 'orig', 'group', 'mat', 'attr', 'kf'}
+        # shift moves the mesh data so its origin is at this location
+        start = time.perf_counter()
+
+        group = obj['group']
+        if(self.proxy_mode == 'FULL'):
+            # each mesh only gets the vertices referenced by its TRIS range
+            verts, normals, uv, faces = meshData = self.model.getMeshData(group)
+            geometryKey = self.meshHashes.get(group)
+            if(geometryKey is None):
+                # also the geometry hash of the fingerprint
+                geometryKey = self.meshHashes[group] = self.model.getMeshHash(meshData)
+        else:
+            # a placeholder, the full mesh is built later by xplane11import_load_full
+            verts, normals, uv, faces = self.model.getProxyMeshData(group, self.proxy_mode == 'BOUNDS', self.proxy_faces)
+            geometryKey = (group.offset, group.count)
+
+        # TRIS groups with identical geometry, material and shift share one mesh datablock
+        # switches and knobs often draw the same range under different ANIM blocks
+        key = (geometryKey, obj['mat'].name if obj['mat'] else '', tuple(shift) if shift is not None else None)
+        me = self.meshCache.get(key)
+
+        # create the mesh
+        meshObj = self.createMesh(obj['label'], obj['orig'], verts, faces, obj['mat'], uv, normals, obj['attr'], me)
+
+        if(me is None):
+            if(shift is not None):
+                self.transformMeshOrigin(meshObj, shift)
+            self.meshCache[key] = meshObj.data
+
+        if(self.proxy_mode != 'FULL'):
+            meshObj[PROXY_SOURCE] = self.model.filepath
+            meshObj[PROXY_RANGE] = (group.offset, group.count)
+            meshObj[PROXY_SHIFT] = tuple(shift) if shift is not None else (0.0, 0.0, 0.0)
+            meshObj[PROXY_HASH] = self.getGeometryHash(group)
+
+        seconds = time.perf_counter() - start
+        self.profiler.add('meshes', seconds)
+        self.profiler.addObject(meshObj.name, seconds)
+        return meshObj
+
+    def createMergedObject(self, groups, mat, origin):
+        # one object for several static TRIS groups
+        # the vertices of each group with a debug label are kept in a vertex group
+        # the groups named OBJ<id> by the parser get none, there can be thousands of them
+        start = time.perf_counter()
+        verts, normals, uv, faces, labels = self.model.getMergedMeshData(groups)
+        name = mat.name if mat else groups[0].label or 'Merged'
+        # the merged groups have the same attribute state, it is kept as the attributes of the object
+        meshObj = self.createMesh(name, origin, verts, faces, mat, uv, normals, groups[0].state)
+        for label, used in labels:
+            meshObj.vertex_groups.new(name=label).add(used, 1.0, 'REPLACE')
+
+        seconds = time.perf_counter() - start
+        self.profiler.add('meshes', seconds)
+        self.profiler.addObject(meshObj.name, seconds)
+        return meshObj
+
+    def createMaterials(self, model):
+        # get a Blender material for each TEXTURE block
+        # materials are shared by all imports, a texture set is only built once
+        directory = os.path.dirname(model.filepath)
+        materials = []
+        material = 0
+        for mat in model.materials:
+            loaded = getMaterial(directory, mat)
+            if(loaded):
+                material = loaded
+                # set the layer/collection texture property
+                # just in case this is needed
+                # the exporter should be able to autodetect the texture from the material
+                # 
+                try:
+                    collection.xplane.layer.texture = mat.diffuse
+                    if(mat.normal):
+                        collection.xplane.layer.texture_normal = mat.normal
+                    if(mat.lit):
+                        collection.xplane.layer.texture_lit = mat.lit
+                except:
+                    print('Could not assign textures to layer props')
+
+            # if the texture failed to load, the previous material is kept
+            materials.append(material)
+
+        return materials
+
+    def getGroupMaterial(self, materials, group):
+        # the material of a TRIS group, a blend attribute selects a variant of the TEXTURE material
+        if(group.mat is None):
+            return 0
+        blend = getBlendMode(group.state)
+        if(blend is not None and materials[group.mat]):
+            material = getMaterial(os.path.dirname(self.model.filepath), self.model.materials[group.mat], blend)
+            if(material):
+                return material
+        return materials[group.mat]
+
+    # build the scene from a parsed file
+    def run(self, origo, model):
+        if(len(model.unknownCommands)):
+            print('Skipped unsupported commands: ' + ', '.join('%s (%d)' % item for item in sorted(model.unknownCommands.items())))
+
+        self.model = model
+        if(self.proxy_mode != 'FULL'):
+            proxyModels[model.filepath] = model
+        # static TRIS groups merged into one object, they are always built with full geometry
+        mergedGroups = [tuple(groups) for groups in model.getMergedGroups()] if self.use_merge else []
+        merged = set(itertools.chain.from_iterable(mergedGroups))
+        self.merged = merged
+        # TRIS group -> geometry hash, createBlenderObject hashes each mesh it builds only once
+        self.meshHashes = {}
+        self.poolHash = None
+        # the fingerprints are only needed before building to find the unchanged objects,
+        # otherwise they are taken at the end from the hashes of the built meshes
+        fingerprints = self.getFingerprints(model, mergedGroups) if self.use_reimport else None
+        # (Blender object, TRIS group or anim block) to tag with its fingerprint
+        tagged = []
+        # TRIS groups and anim blocks whose object from an earlier import is unchanged
+        kept = {}
+        if(self.use_reimport):
+            existing = self.getImportedObjects()
+            for item, (key, fingerprint) in fingerprints.items():
+                ob = existing.pop(key, None)
+                if(ob is not None and ob.get(IMPORT_FINGERPRINT) == fingerprint):
+                    kept[item] = ob
+                elif(ob is not None):
+                    existing[key] = ob
+            # changed objects are rebuilt, objects that are no longer in the file are removed
+            # a changed armature also changes the fingerprints of its children
+            self.removeObjects(list(existing.values()))
+            if(len(kept) == len(fingerprints)):
+                print('Nothing changed')
+                return 0
+
+        with self.profiler.phase('textures'):
+            materials = self.createMaterials(model)
+
+        self.directXPlane = self.hasXPlaneLayout()
+        # all objects are created first and linked to the collection at the end
+        # only the operator fallback for an XPlane2Blender layout we don't know needs
+        # the objects in the view layer right away, without the plugin there are no operators
+        hasXPlane = bpy.types.Object.bl_rna.properties.get('xplane') is not None
+        self.deferLinking = self.directXPlane or not hasXPlane
+        self.pendingObjects = []
+        layerCollection = bpy.context.view_layer.layer_collection.children[collection.name]
+        if(self.deferLinking):
+            layerCollection.exclude = True
+        # (geometry hash, material, shift) -> mesh datablock
+        self.meshCache = {}
+
+        # convert the TRIS groups to the mesh dicts used to create the Blender objects
+        def meshDict(group):
+            return {'id': group.id, 'label': group.label, 'orig': Vector( origo ), 'group': group, 'mat': self.getGroupMaterial(materials, group), 'attr': group.attr, 'kf': group.kf}
+
+        objects = [meshDict(group) for group in model.objects if group not in kept and group not in merged]
+        armatures = [{'block': block, 'label': block.label, 'kf': block.kf, 'parent': block.parent, 'meshes': [meshDict(group) for group in block.meshes if group not in kept]} for block in model.armatures]
+
+        # loop through the armatures and create them in Blender
+        # we will add keyframes to all the armatures
+        armatureObjects = []
+        # anim block -> Blender armature object
+        blockObjects = {}
+        # anim block -> location of its armature before parenting
+        blockLocations = {}
+        for arm in armatures:
+            # need to move the armature to the correct location based on rotations
+            keyframes = arm['kf']
+            origins = self.getOrigins(keyframes)
+            location = origins[0]
+            rotOrigin = origins[1]
+            if(arm['block'] in kept):
+                # unchanged, only changed meshes are added to it
+                BlenderArm = kept[arm['block']]
+                # the same location it got when it was built
+                armLocation = self.getFirstLocation(keyframes, rotOrigin)
+            else:
+                # create the armature 
+                BlenderArm = self.createArmature( arm['label'], rotOrigin)
+                tagged.append( (BlenderArm, arm['block']) )
+                armatureObjects.append(BlenderArm)
+
+                # apply the keyframes to the armature
+                with self.profiler.phase('keyframes'):
+                    self.createKeyframes(keyframes, BlenderArm)
+                # the keyframes moved it to the first location key
+                armLocation = BlenderArm.location.copy()
+            blockObjects[arm['block']] = BlenderArm
+            blockLocations[arm['block']] = armLocation
+
+            # create meshes associated with this block
+            for mesh in arm['meshes']:
+                # translate the mesh to match the armature origin
+                meshObj = self.createBlenderObject(mesh, armLocation.copy())
+                tagged.append( (meshObj, mesh['group']) )
+                # parent it to the armature
+                self.addChild(BlenderArm, meshObj) 
+
+        # loop through the loose meshes and create the Blender meshes
+        for index, obj in enumerate(objects):
+            if(len(obj['kf'])):
+                origins = self.getOrigins(obj['kf'])
+                location = origins[0]
+                rotOrigin = origins[1]
+                meshObj = self.createBlenderObject(obj, rotOrigin if location != rotOrigin else None)
+                self.translateObject(meshObj, rotOrigin)
+                # apply object animation keyframes
+                with self.profiler.phase('keyframes'):
+                    self.createKeyframes(obj['kf'], meshObj)
+            else:
+                meshObj = self.createBlenderObject(obj)
+            tagged.append( (meshObj, obj['group']) )
+
+        numMerged = 0
+        for groups in mergedGroups:
+            if(groups not in kept):
+                mat = self.getGroupMaterial(materials, groups[0])
+                meshObj = self.createMergedObject(groups, mat, Vector(origo))
+                tagged.append( (meshObj, groups) )
+                numMerged += 1
+        if(len(mergedGroups)):
+            print('Merged %d static objects into %d' % (len(merged), len(mergedGroups)))
+
+        # create the parent/child relationships
+        # the parser links every block to its parent block, so this is a single pass
+        # a kept armature keeps its parent, its parent can't have changed
+        parentingStart = time.perf_counter()
+        for arm in armatures:
+            if(arm['parent'] is not None and arm['block'] not in kept):
+                try:
+                    parentArm = blockObjects[arm['parent']]
+                    childArm = blockObjects[arm['block']]
+                    # reset the child position
+                    # the children come before their parents, so the parent location isn't reset yet
+                    childArm.location = childArm.location - blockLocations[arm['parent']]
+                    self.addChild(parentArm, childArm)
+                except Exception as e:
+                    print(e)     
+
+        # end loop
+
+        self.profiler.add('parenting', time.perf_counter() - parentingStart)
+
+        if(fingerprints is None):
+            # the built meshes are hashed already
+            fingerprints = self.getFingerprints(model, mergedGroups)
+        for ob, item in tagged:
+            self.tagObject(ob, fingerprints[item])
+
+        with self.profiler.phase('linking'):
+            if(self.deferLinking):
+                self.linkPendingObjects(layerCollection)
+            # bones need the armatures in the view layer
+            self.createBones(armatureObjects)
+
+            # return to frame 0, the scene is evaluated once for everything
+            bpy.context.scene.frame_current = 0
+            bpy.context.view_layer.update()
+
+        numMeshes = len(self.meshCache)
+        numMeshObjects = len(objects) + sum(len(arm['meshes']) for arm in armatures)
+        if(numMeshes < numMeshObjects):
+            print('%d objects share %d meshes' % (numMeshObjects, numMeshes))
+        if(len(kept)):
+            print('Kept %d unchanged objects' % len(kept))
+
+        return len(objects) + len(armatureObjects) + numMerged
+        
+class xplane11import_load_full(bpy.types.Operator):
+    bl_label = "Load Full X-Plane Geometry"
+    bl_idname = "object.xplane11import_load_full"
+    bl_description = "Replace the selected placeholders with their full geometry"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    # the mesh is filled the same way as in the import
+    flatBuffer = xplane11import.flatBuffer
+    fillMesh = xplane11import.fillMesh
+
+    @classmethod
+    def poll(cls, context):
+        return any(PROXY_SOURCE in ob for ob in context.selected_objects)
+
+    def getModel(self, filepath):
+        # the model is kept from the import, after reopening the .blend file it is parsed again
+        model = proxyModels.get(filepath)
+        if(model is None):
+            model = parseFile(filepath)
+            proxyModels[filepath] = model
+        return model
+
+    def execute(self, context):
+        # (file, TRIS range, shift) -> full mesh, for placeholders that share a mesh
+        meshes = {}
+        # file -> hash of its vertex pool
+        poolHashes = {}
+        numLoaded = 0
+        numChanged = 0
+        for ob in context.selected_objects:
+            if(PROXY_SOURCE not in ob):
+                continue
+            filepath = ob[PROXY_SOURCE]
+            offset, count = ob[PROXY_RANGE]
+            shift = Vector(ob[PROXY_SHIFT])
+            key = (filepath, offset, count, tuple(shift))
+            me = meshes.get(key)
+            if(me is None):
+                try:
+                    model = self.getModel(filepath)
+                except (OSError, ValueError) as e:
+                    self.report({'WARNING'}, 'Could not read %s: %s' % (filepath, e))
+                    continue
+                group = TrisGroup(0, ob.name, offset, count, None, [], Keyframes(KeyframeStore()))
+                if(filepath not in poolHashes):
+                    poolHashes[filepath] = model.getPoolHash()
+                if(ob.get(PROXY_HASH) != model.getRangeHash(group, poolHashes[filepath])):
+                    # the file changed since the import, the range may be other geometry now
+                    print('%s: the geometry in %s changed, import the file again' % (ob.name, filepath))
+                    numChanged += 1
+                    continue
+                verts, normals, uv, faces = model.getMeshData(group)
+                me = bpy.data.meshes.new(ob.data.name)
+                self.fillMesh(me, verts, faces, uv, normals)
+                me.transform(mathutils.Matrix.Translation(-shift))
+                for mat in ob.data.materials:
+                    me.materials.append(mat)
+                meshes[key] = me
+
+            proxyMesh = ob.data
+            ob.data = me
+            if(proxyMesh.users == 0):
+                bpy.data.meshes.remove(proxyMesh)
+            for prop in (PROXY_SOURCE, PROXY_RANGE, PROXY_SHIFT, PROXY_HASH):
+                if(prop in ob):
+                    del ob[prop]
+            numLoaded += 1
+
+        if(numChanged):
+            self.report({'WARNING'}, 'Loaded the full geometry of %d objects, %d were skipped because their file changed since the import' % (numLoaded, numChanged))
+        else:
+            self.report({'INFO'}, 'Loaded the full geometry of %d objects' % numLoaded)
+        return {"FINISHED"}
+
+
+def clearProxyModels():
+    proxyModels.clear()
+
+
+def menu_func(self, context):
+    self.layout.operator(xplane11import.bl_idname, text="XPlane 11 Object (.obj)")
@@ -0,0 +1,165 @@
+#---------------------------------------------------------------------------
+#
+#  Material registry shared by all TRIS groups and all imports in a
+#  Blender session
+#
+#  A material is built once for each set of textures and blend mode.
+#  Every TEXTURE block, TRIS group and file that uses the same textures
+#  gets the same material instead of a new copy of its node tree.
+#
+#  Like the image cache, only the material names are kept and looked up
+#  in bpy.data again for every use.
+#
+#---------------------------------------------------------------------------
+
+import bpy
+
+from .textures import loadImage, resolveTexturePath
+
+# (diffuse path, normal path, lit path, blend mode) -> name of the bpy material
+materialCache = {}
+# custom property on the cached materials with their key, a material that
+# only has the same name is not used
+MATERIAL_KEY = 'xplane11import_material'
+
+# ATTR_ lines that change how the alpha of the diffuse texture is used
+# attribute -> (blend method, default alpha cutoff)
+BLEND_ATTRIBUTES = {
+    'ATTR_blend': ('BLEND', 0.5),
+    'ATTR_no_blend': ('CLIP', 0.5),
+    'ATTR_shadow_blend': ('HASHED', 0.5),
+}
+
+
+def getBlendMode(attr):
+    # the blend mode set by the attribute state of a TRIS group
+    # returns (blend method, alpha cutoff) or None to keep the default
+    blend = None
+    for attribute in attr:
+        if(attribute[0] in BLEND_ATTRIBUTES):
+            method, cutoff = BLEND_ATTRIBUTES[attribute[0]]
+            try:
+                cutoff = float(attribute[1])
+            except (IndexError, ValueError):
+                pass
+            blend = (method, cutoff)
+    return blend
+
+
+def getMaterial(directory, mat, blend=None):
+    # returns the material for a TEXTURE block of the obj, or None if the diffuse texture can't be loaded
+    # mat: model.Material
+    # blend: (blend method, alpha cutoff) from getBlendMode
+    diffusePath = resolveTexturePath(directory, mat.diffuse)
+    normalPath = resolveTexturePath(directory, mat.normal) if mat.normal else None
+    litPath = resolveTexturePath(directory, mat.lit) if mat.lit else None
+    key = (diffusePath, normalPath, litPath, blend)
+
+    name = materialCache.get(key)
+    if(name is not None):
+        material = bpy.data.materials.get(name)
+        # the material may have been deleted or renamed since the last import
+        if(material is not None and material.get(MATERIAL_KEY) == repr(key)):
+            return material
+        del materialCache[key]
+
+    image = loadImage(directory, mat.diffuse)
+    if(not image):
+        return None
+
+    name = mat.diffuse.split('.')[0]
+    if(blend is not None):
+        name += '_' + blend[0].lower()
+    material = createBlenderMaterial(image, name)
+
+    if(normalPath):
+        nrmImage = loadImage(directory, mat.normal)
+        if(nrmImage):
+            createNormalMap(material, nrmImage)
+
+    if(litPath):
+        litImage = loadImage(directory, mat.lit)
+        if(litImage):
+            createEmissionShader(material, litImage)
+
+    if(blend is not None):
+        setBlendMode(material, blend)
+
+    material[MATERIAL_KEY] = repr(key)
+    materialCache[key] = material.name
+    return material
+
+
+def createBlenderMaterial(diffuseImage, name):
+    # Create and add a material
+    material = bpy.data.materials.new('Material')
+    # Add Texture to the Material via shader nodes
+    material.use_nodes = True
+    material.name = name
+
+    bsdf = material.node_tree.nodes["Principled BSDF"]
+    texImage = material.node_tree.nodes.new('ShaderNodeTexImage')
+    texImage.name = 'Diffuse'
+    texImage.location = -350, 350
+    texImage.image = diffuseImage
+    material.node_tree.links.new(bsdf.inputs['Base Color'], texImage.outputs['Color'])
+
+    return material
+
+
+def createNormalMap(material, normalImage):
+    if(material.node_tree):
+        nrmImage = material.node_tree.nodes.new('ShaderNodeTexImage')
+        nrmImage.location = -650, -50
+        nrmImage.image = normalImage
+        nrmImage.image.colorspace_settings.name = 'Non-Color'
+        mappingNode = material.node_tree.nodes.new('ShaderNodeNormalMap')
+        mappingNode.location = -300, -50
+        mappingNode.space = 'BLENDER_OBJECT'
+
+        material.node_tree.links.new(mappingNode.inputs['Color'], nrmImage.outputs['Color'])
+        bsdf = material.node_tree.nodes["Principled BSDF"]
+        material.node_tree.links.new(bsdf.inputs['Normal'], mappingNode.outputs['Normal'])
+
+    return material
+
+
+def createEmissionShader(material, litImage):
+    if(material.node_tree):
+        litNode = material.node_tree.nodes.new('ShaderNodeTexImage')
+        litNode.location = -650, -350
+        litNode.image = litImage
+        EmissionNode = material.node_tree.nodes.new('ShaderNodeEmission')
+        EmissionNode.location = -300, -350
+        material.node_tree.links.new(EmissionNode.inputs['Color'], litNode.outputs['Color'])
+        bsdf = material.node_tree.nodes["Principled BSDF"]
+        mixShader = material.node_tree.nodes.new('ShaderNodeMixShader')
+        mixShader.location = 300, -200
+        mixShader.inputs[0].default_value = 0.0
+
+        materialOutput = material.node_tree.nodes['Material Output']
+        materialOutput.location = 500, 150
+        material.node_tree.links.new(mixShader.inputs[2], EmissionNode.outputs['Emission'])
+        material.node_tree.links.new(materialOutput.inputs['Surface'], mixShader.outputs['Shader'])
+        material.node_tree.links.new(mixShader.inputs[1], bsdf.outputs['BSDF'])
+
+    return material
+
+
+def setBlendMode(material, blend):
+    # use the alpha of the diffuse texture
+    method, cutoff = blend
+    if(material.node_tree):
+        bsdf = material.node_tree.nodes["Principled BSDF"]
+        texImage = material.node_tree.nodes['Diffuse']
+        material.node_tree.links.new(bsdf.inputs['Alpha'], texImage.outputs['Alpha'])
+    # these are only used by EEVEE Legacy, newer versions ignore them
+    if(hasattr(material, 'blend_method')):
+        material.blend_method = method
+    if(hasattr(material, 'alpha_threshold')):
+        material.alpha_threshold = cutoff
+    return material
+
+
+def clearMaterialCache():
+    materialCache.clear()
@@ -0,0 +1,533 @@
+#---------------------------------------------------------------------------
+#
+#  Intermediate scene model for a parsed X-Plane .obj file
+#
+#  This module must never import bpy or mathutils, it is shared by the
+#  Blender operator and by headless tools that only need the parsed data.
+#
+#---------------------------------------------------------------------------
+
+import hashlib
+import itertools
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# geometry pools of the model: name, array typecode, values per vertex or index
+GEOMETRY = (('verts', 'f', 3), ('normals', 'f', 3), ('uv', 'f', 2), ('faces', 'i', 1))
+
+
+# triangles of a bounding box, corner i is at (x[i & 1], y[i >> 1 & 1], z[i >> 2 & 1])
+BOX_FACES = ((0, 4, 6), (0, 6, 2), (1, 3, 7), (1, 7, 5), (0, 1, 5), (0, 5, 4),
+             (2, 6, 7), (2, 7, 3), (0, 2, 3), (0, 3, 1), (4, 5, 7), (4, 7, 6))
+
+
+# keyframe types in KeyframeStore.types
+KEY_LOC = 0
+KEY_ROT = 1
+KEY_HIDE = 2
+KEY_SHOW = 3
+KEY_LOOP = 4
+# names of the keyframe types, also the XPlane2Blender anim_type of hide and show
+KEY_TYPES = ('loc', 'rot', 'hide', 'show', 'loop')
+# keyframe arrays of the KeyframeStore -> container array name
+KEYFRAME_ARRAYS = (('types', 'kfTypes'), ('values', 'kfValues'), ('angles', 'kfAngles'), ('vectors', 'kfVectors'), ('refs', 'kfRefs'))
+
+
+class KeyframeStore:
+    # all keyframes of a file in parallel arrays, one item per keyframe:
+    #   loc:  vectors = position, values = dataref value
+    #   rot:  vectors = axis, values = dataref value, angles = angle in degrees
+    #   hide/show: values = v1, angles = v2
+    #   loop: values = loop value
+    # All positions and axes are already converted to Blender axes (XZY, Y negated)
+    __slots__ = ('types', 'values', 'angles', 'vectors', 'refs', 'datarefs', 'datarefIndex')
+
+    def __init__(self):
+        self.types = array('b')
+        self.values = array('d')
+        self.angles = array('d')
+        # 3 values per keyframe
+        self.vectors = array('d')
+        # index into datarefs, -1 for loop keyframes and translations without a dataref
+        self.refs = array('i')
+        # every dataref string once, in the order they were first used
+        self.datarefs = []
+        self.datarefIndex = {}
+
+    def intern(self, dataref):
+        # returns the index of the dataref in self.datarefs
+        index = self.datarefIndex.get(dataref)
+        if(index is None):
+            index = len(self.datarefs)
+            self.datarefIndex[dataref] = index
+            self.datarefs.append(dataref)
+        return index
+
+    def add(self, type, vector, value, angle, ref):
+        # returns the index of the new keyframe
+        self.types.append(type)
+        self.vectors.extend(vector)
+        self.values.append(value)
+        self.angles.append(angle)
+        self.refs.append(ref)
+        return len(self.types) - 1
+
+    def __len__(self):
+        return len(self.types)
+
+
+class Keyframes:
+    # the keyframes of an anim block, as ranges of a KeyframeStore
+    # the parser appends to the keyframes of the open block, TRIS groups share
+    # the object so they also see keys added after them, like a shared list
+    __slots__ = ('store', 'ranges')
+
+    def __init__(self, store, ranges=None):
+        self.store = store
+        # flat start, end pairs
+        self.ranges = ranges if ranges is not None else array('i')
+
+    def append(self, index):
+        # index is a keyframe just added to the store
+        ranges = self.ranges
+        if(len(ranges) and ranges[-1] == index):
+            ranges[-1] = index + 1
+        else:
+            ranges.extend( (index, index + 1) )
+
+    def __add__(self, other):
+        # the keyframes of both, without copying any keyframe
+        result = Keyframes(self.store, array('i', self.ranges))
+        for start, end in zip(other.ranges[0::2], other.ranges[1::2]):
+            if(len(result.ranges) and result.ranges[-1] == start):
+                result.ranges[-1] = end
+            else:
+                result.ranges.extend( (start, end) )
+        return result
+
+    def __len__(self):
+        return sum(self.ranges[1::2]) - sum(self.ranges[0::2])
+
+    def indices(self):
+        # the store index of every keyframe, in order
+        return itertools.chain.from_iterable(range(start, end) for start, end in zip(self.ranges[0::2], self.ranges[1::2]))
+
+    def getOrigins(self):
+        # (sum of all translations, the translation before the first rotation)
+        # the rotation origin of the block is where the translation left it
+        store = self.store
+        types, vectors = store.types, store.vectors
+        origin = [0.0, 0.0, 0.0]
+        tempOrigin = (0.0, 0.0, 0.0)
+        rotOrigin = None
+        for i in self.indices():
+            if(types[i] == KEY_LOC):
+                tempOrigin = vectors[3 * i:3 * i + 3]
+                origin[0] += tempOrigin[0]
+                origin[1] += tempOrigin[1]
+                origin[2] += tempOrigin[2]
+            elif(types[i] == KEY_ROT and rotOrigin is None):
+                rotOrigin = tuple(tempOrigin)
+        return tuple(origin), rotOrigin or (0.0, 0.0, 0.0)
+
+    def getHash(self):
+        # fingerprint of the keyframe data, the same for equal keyframes in any file
+        store = self.store
+        digest = hashlib.sha1()
+        for start, end in zip(self.ranges[0::2], self.ranges[1::2]):
+            for values in (store.types, store.values, store.angles):
+                digest.update(values[start:end].tobytes())
+            digest.update(store.vectors[3 * start:3 * end].tobytes())
+            for ref in store.refs[start:end]:
+                digest.update(store.datarefs[ref].encode('utf-8') if ref >= 0 else b'')
+                digest.update(b'\0')
+        return digest.hexdigest()
+
+    def __repr__(self):
+        return 'Keyframes(%d)' % len(self)
+
+
+class Material:
+    # texture references for one TEXTURE block, paths are relative to the .obj
+    __slots__ = ('diffuse', 'normal', 'lit')
+
+    def __init__(self, diffuse):
+        self.diffuse = diffuse
+        self.normal = None
+        self.lit = None
+
+    def __repr__(self):
+        return 'Material(%r, normal=%r, lit=%r)' % (self.diffuse, self.normal, self.lit)
+
+
+class TrisGroup:
+    # one TRIS command, a range in the index pool of the file
+    __slots__ = ('id', 'label', 'hasLabel', 'offset', 'count', 'mat', 'attr', 'state', 'kf')
+
+    def __init__(self, id, label, offset, count, mat, attr, kf, hasLabel=False, state=()):
+        self.id = id
+        self.label = label
+        # True if the label is from a debug # line, False for the OBJ<id> default
+        self.hasLabel = hasLabel
+        # start and length in ObjModel.faces
+        self.offset = offset
+        self.count = count
+        # index into ObjModel.materials or None if no texture was set
+        self.mat = mat
+        # raw ATTR_ lines as token lists, only the lines since the previous TRIS
+        self.attr = attr
+        # the attribute state this group is drawn with, tuples of the ATTR_ lines
+        # that are still set, including the earlier ones and the LOD
+        self.state = state
+        # Keyframes of the enclosing anim block, shared with the block
+        self.kf = kf
+
+    def __repr__(self):
+        return 'TrisGroup(%r, %d, %d)' % (self.label, self.offset, self.count)
+
+
+class AnimBlock:
+    # an ANIM_begin/ANIM_end block, the blocks that need an armature form a tree
+    __slots__ = ('label', 'kf', 'parent', 'children', 'meshes')
+
+    def __init__(self, label, kf, parent, meshes):
+        self.label = label
+        self.kf = kf
+        # parent AnimBlock or None for a root armature
+        self.parent = parent
+        self.children = []
+        self.meshes = meshes
+
+    def __repr__(self):
+        return 'AnimBlock(%r, parent=%r, meshes=%d)' % (self.label, self.parent.label if self.parent else '', len(self.meshes))
+
+
+class ObjModel:
+    # everything the importer needs to build the Blender scene
+    def __init__(self, filepath):
+        self.filepath = filepath
+        # vertex pool from the VT lines
+        # float32 arrays of shape (n, 3) and (n, 2) when parsed with numpy,
+        # otherwise lists of tuples
+        self.verts = []
+        self.normals = []
+        self.uv = []
+        # index pool from the IDX and IDX10 lines
+        # int32 numpy array or array('i')
+        self.faces = []
+        self.materials = []
+        # keyframes of all anim blocks, the blocks and TRIS groups have Keyframes ranges of it
+        self.keyframes = KeyframeStore()
+        # dataref -> [(anim block or TRIS group, array of keyframe indices)], see indexDatarefs
+        self.datarefUsers = {}
+        # TRIS groups that are not part of an armature
+        self.objects = []
+        # anim blocks that need an armature, in ANIM_end order
+        # so children are listed before their parents
+        self.armatures = []
+        # command token -> number of lines that were skipped as unsupported
+        self.unknownCommands = {}
+        # Profiler with the parser timings when parsed with profile=True
+        self.profile = None
+
+    def indexDatarefs(self):
+        # index the animated parts by the datarefs of their keyframes
+        # the parts are the anim blocks that become armatures and the animated loose TRIS groups
+        store = self.keyframes
+        users = {}
+        # Keyframes -> {dataref index: keyframe indices}, TRIS groups of one block share their keyframes
+        refsByKeyframes = {}
+        for owner in itertools.chain(self.armatures, self.objects):
+            refs = refsByKeyframes.get(id(owner.kf))
+            if(refs is None):
+                refs = {}
+                for i in owner.kf.indices():
+                    ref = store.refs[i]
+                    if(ref >= 0):
+                        refs.setdefault(ref, array('i')).append(i)
+                refsByKeyframes[id(owner.kf)] = refs
+            for ref, indices in refs.items():
+                users.setdefault(store.datarefs[ref], []).append( (owner, indices) )
+        self.datarefUsers = users
+
+    def getDatarefUsers(self, dataref):
+        # the anim blocks and TRIS groups animated by a dataref, with the indices of their keys
+        return self.datarefUsers.get(dataref, [])
+
+    def getMeshData(self, group):
+        # compact the vertex pool to the vertices used by a TRIS group
+        # returns verts, normals, uv and the faces remapped to the compacted lists
+        return self.compactFaces(self.faces[group.offset:group.offset + group.count])
+
+    def compactFaces(self, face_lst):
+        if(numpy is not None and isinstance(face_lst, numpy.ndarray)):
+            # used vertices in sorted order, and the face indices into them
+            used, local = numpy.unique(face_lst, return_inverse=True)
+            faces = local.astype(numpy.int32).reshape(-1, 3)
+            return self.verts[used], self.normals[used], self.uv[used], faces
+
+        remap = {}
+        for index in face_lst:
+            if(index not in remap):
+                remap[index] = len(remap)
+        used = list(remap)
+        verts = [self.verts[i] for i in used]
+        normals = [self.normals[i] for i in used]
+        uv = [self.uv[i] for i in used]
+        local = [remap[i] for i in face_lst]
+        faces = tuple( zip(*[iter(local)]*3) )
+        return verts, normals, uv, faces
+
+    def getMergedGroups(self):
+        # static TRIS groups with the same material and attribute state, in file order
+        # groups of different LODs are never merged, the LOD is part of the state
+        # returns a list of group lists, groups that have nothing to merge with are left out
+        # animated groups are never merged, they need their own object
+        merged = {}
+        for group in self.objects:
+            if(len(group.kf)):
+                continue
+            key = (group.mat, group.state)
+            merged.setdefault(key, []).append(group)
+        return [groups for groups in merged.values() if len(groups) > 1]
+
+    def getMergedMeshData(self, groups):
+        # one mesh for several TRIS groups, in the same format as getMeshData
+        # plus a list of (label, vertex indices) with the vertices used by each group with a debug label
+        if(numpy is not None and isinstance(self.faces, numpy.ndarray)):
+            face_lst = numpy.concatenate([self.faces[group.offset:group.offset + group.count] for group in groups])
+        else:
+            face_lst = array('i')
+            for group in groups:
+                face_lst.extend(self.faces[group.offset:group.offset + group.count])
+        verts, normals, uv, faces = self.compactFaces(face_lst)
+
+        labels = []
+        start = 0
+        for group in groups:
+            end = start + group.count // 3
+            if(not group.hasLabel):
+                start = end
+                continue
+            if(hasattr(faces, 'ravel')):
+                used = numpy.unique(faces[start:end]).tolist()
+            else:
+                used = sorted(set(itertools.chain.from_iterable(faces[start:end])))
+            labels.append( (group.label, used) )
+            start = end
+        return verts, normals, uv, faces, labels
+
+    def getProxyMeshData(self, group, bounds=True, maxFaces=100):
+        # placeholder geometry for a TRIS group, in the same format as getMeshData
+        # bounds: the bounding box of the group
+        # otherwise every n-th triangle, so at most maxFaces triangles are kept
+        face_lst = self.faces[group.offset:group.offset + group.count]
+        if(not len(face_lst)):
+            # a TRIS group with count 0 has no bounding box, it stays an empty mesh
+            return self.compactFaces(face_lst)
+        if(not bounds):
+            step = max(1, -(-len(face_lst) // 3 // max(maxFaces, 1)))
+            if(numpy is not None and isinstance(face_lst, numpy.ndarray)):
+                face_lst = face_lst.reshape(-1, 3)[::step].ravel()
+            else:
+                face_lst = array('i', itertools.chain.from_iterable(face_lst[i:i + 3] for i in range(0, len(face_lst) - 2, step * 3)))
+            return self.compactFaces(face_lst)
+
+        if(numpy is not None and isinstance(face_lst, numpy.ndarray)):
+            used = self.verts[numpy.unique(face_lst)]
+            low, high = used.min(axis=0), used.max(axis=0)
+        else:
+            used = [self.verts[i] for i in set(face_lst)]
+            low = [min(axis) for axis in zip(*used)]
+            high = [max(axis) for axis in zip(*used)]
+        corners = [(x, y, z) for z in (low[2], high[2]) for y in (low[1], high[1]) for x in (low[0], high[0])]
+        # the normals point away from the center
+        normals = [(x, y, z) for z in (-0.577, 0.577) for y in (-0.577, 0.577) for x in (-0.577, 0.577)]
+        uv = [(0.0, 0.0)] * 8
+        if(numpy is not None and isinstance(face_lst, numpy.ndarray)):
+            return numpy.array(corners, numpy.float32), numpy.array(normals, numpy.float32), numpy.array(uv, numpy.float32), numpy.array(BOX_FACES, numpy.int32)
+        return corners, normals, uv, BOX_FACES
+
+    def getGeometryArrays(self):
+        # the geometry pools as flat float32/int32 buffers, numpy arrays or array.array
+        arrays = {}
+        for name, typecode, width in GEOMETRY:
+            values = getattr(self, name)
+            if(hasattr(values, 'ravel')):
+                arrays[name] = values.ravel()
+            elif(isinstance(values, array)):
+                arrays[name] = values
+            else:
+                arrays[name] = array(typecode, itertools.chain.from_iterable(values))
+        return arrays
+
+    def setGeometryArrays(self, arrays):
+        # the inverse of getGeometryArrays
+        # numpy arrays are reshaped, other buffers become lists of tuples like the parser creates
+        for name, typecode, width in GEOMETRY:
+            values = arrays[name]
+            if(hasattr(values, 'reshape')):
+                if(width > 1):
+                    values = values.reshape(-1, width)
+            elif(width > 1):
+                values = list(zip(*[iter(values)]*width))
+            setattr(self, name, values)
+
+    def getKeyframeArrays(self):
+        # the arrays of the KeyframeStore by their container array name
+        return {arrayName: getattr(self.keyframes, name) for name, arrayName in KEYFRAME_ARRAYS}
+
+    def setKeyframeArrays(self, arrays):
+        # the inverse of getKeyframeArrays, the store always has array.array buffers
+        store = self.keyframes
+        for name, arrayName in KEYFRAME_ARRAYS:
+            setattr(store, name, array(getattr(store, name).typecode, arrays[arrayName].tobytes()))
+
+    def getTree(self):
+        # everything except the arrays, as JSON compatible data
+        # keyframes are flat start, end pairs of ranges in the kf arrays
+        blockIndex = {block: index for index, block in enumerate(self.armatures)}
+        groups = []
+        armatures = []
+        for block in self.armatures:
+            armatures.append({
+                'label': block.label,
+                'parent': blockIndex[block.parent] if block.parent is not None else None,
+                'keyframes': list(block.kf.ranges),
+                'groups': [],
+            })
+
+        for block, groupList in [(None, self.objects)] + [(block, block.meshes) for block in self.armatures]:
+            for group in groupList:
+                if(block is not None):
+                    armatures[blockIndex[block]]['groups'].append(len(groups))
+                groups.append({
+                    'id': group.id,
+                    'label': group.label,
+                    'hasLabel': group.hasLabel,
+                    'offset': group.offset,
+                    'count': group.count,
+                    'material': group.mat,
+                    'attributes': [' '.join(attribute) for attribute in group.attr],
+                    'state': [' '.join(attribute) for attribute in group.state],
+                    'keyframes': list(group.kf.ranges),
+                    'armature': blockIndex[block] if block is not None else None,
+                })
+
+        return {
+            'materials': [{'diffuse': mat.diffuse, 'normal': mat.normal, 'lit': mat.lit} for mat in self.materials],
+            'datarefs': list(self.keyframes.datarefs),
+            'groups': groups,
+            'armatures': armatures,
+            'unknownCommands': dict(self.unknownCommands),
+        }
+
+    def setTree(self, tree):
+        # the inverse of getTree, the keyframe arrays are set with setKeyframeArrays
+        # call indexDatarefs once both are set
+        # the ATTR_ tokens never contain spaces, so joining and splitting them is lossless
+        store = self.keyframes
+        store.datarefs = list(tree['datarefs'])
+        store.datarefIndex = {dataref: index for index, dataref in enumerate(store.datarefs)}
+
+        self.materials = []
+        for info in tree['materials']:
+            mat = Material(info['diffuse'])
+            mat.normal = info['normal']
+            mat.lit = info['lit']
+            self.materials.append(mat)
+
+        self.armatures = [AnimBlock(info['label'], Keyframes(store, array('i', info['keyframes'])), None, []) for info in tree['armatures']]
+        # armatures are in ANIM_end order, so the children are added in the order the parser added them
+        for block, info in zip(self.armatures, tree['armatures']):
+            if(info['parent'] is not None):
+                block.parent = self.armatures[info['parent']]
+                block.parent.children.append(block)
+
+        self.objects = []
+        for info in tree['groups']:
+            group = TrisGroup(info['id'], info['label'], info['offset'], info['count'], info['material'],
+                              [attribute.split() for attribute in info['attributes']],
+                              Keyframes(store, array('i', info['keyframes'])),
+                              info['hasLabel'], tuple(tuple(attribute.split()) for attribute in info['state']))
+            if(info['armature'] is None):
+                self.objects.append(group)
+            else:
+                self.armatures[info['armature']].meshes.append(group)
+
+        self.unknownCommands = dict(tree['unknownCommands'])
+
+    def getMeshHash(self, meshData):
+        # fingerprint of the data returned by getMeshData
+        # TRIS groups with the same hash have identical geometry
+        digest = hashlib.sha1()
+        for values, typecode in zip(meshData, 'fffi'):
+            if(not hasattr(values, 'tobytes')):
+                values = array(typecode, itertools.chain.from_iterable(values))
+            digest.update(values.tobytes())
+        return digest.hexdigest()
+
+    def getPoolHash(self):
+        # fingerprint of the vertex pool, the arrays are hashed as they are
+        digest = hashlib.sha1()
+        arrays = self.getGeometryArrays()
+        for name, typecode, width in GEOMETRY:
+            if(name != 'faces'):
+                digest.update(arrays[name].tobytes())
+        return digest.hexdigest()
+
+    def getRangeHash(self, group, poolHash):
+        # cheap fingerprint of a TRIS group, its raw index range and the vertex pool hash
+        # unlike getMeshHash it changes with any change of the vertex pool
+        digest = hashlib.sha1(poolHash.encode('ascii'))
+        digest.update(self.faces[group.offset:group.offset + group.count].tobytes())
+        return digest.hexdigest()
+
+    def getFingerprints(self, geometryHash):
+        # match key and fingerprint of every TRIS group and armature block
+        # geometryHash(group) returns the hash of the geometry of a TRIS group,
+        # getMeshHash of its mesh data or the cheaper getRangeHash
+        # returns {TrisGroup or AnimBlock: (key, fingerprint)}
+        # the key is the label and the number of earlier groups with that label,
+        # so a re-import can find the object built from it by an earlier import.
+        # the fingerprint changes when anything the object is built from changes
+        fingerprints = {}
+        labelCounts = {}
+
+        def getKey(kind, label):
+            count = labelCounts.get( (kind, label), 0 )
+            labelCounts[ (kind, label) ] = count + 1
+            return '%s %s %d' % (kind, label, count)
+
+        def getHash(values):
+            return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()
+
+        def addBlock(block):
+            # parents first, a child armature is placed relative to its parent
+            if(block in fingerprints):
+                return fingerprints[block][1]
+            parent = addBlock(block.parent) if block.parent is not None else None
+            fingerprints[block] = (getKey('ANIM', block.label), getHash( (block.kf.getHash(), parent) ))
+            return fingerprints[block][1]
+
+        def addGroup(group, parent):
+            meshHash = geometryHash(group)
+            mat = self.materials[group.mat] if group.mat is not None else None
+            fingerprints[group] = (getKey('TRIS', group.label), getHash( (meshHash, repr(mat), group.attr, group.state, group.kf.getHash(), parent) ))
+
+        for block in self.armatures:
+            addBlock(block)
+        for block in self.armatures:
+            for group in block.meshes:
+                addGroup(group, fingerprints[block][1])
+        for group in self.objects:
+            addGroup(group, None)
+        return fingerprints
+
+    def __repr__(self):
+        return 'ObjModel(%r, verts=%d, objects=%d, armatures=%d)' % (self.filepath, len(self.verts), len(self.objects), len(self.armatures))
@@ -0,0 +1,422 @@
+#---------------------------------------------------------------------------
+#
+#  Parse an X-Plane OBJ8 file into an ObjModel
+#
+#  This is plain Python, it does not need Blender and can be used from
+#  batch tools:
+#
+#    from xplane11import.parser import parseFile
+#    model = parseFile('cockpit.obj')
+#
+#---------------------------------------------------------------------------
+
+from array import array
+
+import time
+
+from .model import ObjModel, Material, TrisGroup, AnimBlock, Keyframes, KEY_LOC, KEY_ROT, KEY_HIDE, KEY_SHOW, KEY_LOOP
+from .profiling import Profiler
+
+try:
+    import numpy
+except ImportError:
+    # numpy ships with Blender, but batch tools may not have it
+    numpy = None
+
+
+# number of VT or IDX tokens converted at once
+# the file is read line by line, so only this much unconverted text is kept
+CHUNK_VALUES = 1 << 16
+
+
+def convertValues(values, typecode, useNumpy):
+    # convert a chunk of tokens to a float32 ('f') or int32 ('i') buffer
+    if(useNumpy):
+        return numpy.array(values, dtype=numpy.float32 if typecode == 'f' else numpy.int32)
+    return array(typecode, map(float if typecode == 'f' else int, values))
+
+
+def joinChunks(chunks, typecode, useNumpy):
+    if(useNumpy):
+        return numpy.concatenate(chunks)
+    result = array(typecode)
+    for chunk in chunks:
+        result.extend(chunk)
+    return result
+
+
+def convertVerts(data, useNumpy):
+    # data is the flat VT buffer, 8 values per vertex: x y z nx ny nz u v
+    # positions and normals are swizzled to Blender axes (x, -z, y)
+    if(useNumpy):
+        data = data.reshape(-1, 8)
+        swizzle = numpy.array((1.0, -1.0, 1.0), dtype=numpy.float32)
+        verts = numpy.ascontiguousarray(data[:, [0, 2, 1]] * swizzle)
+        normals = numpy.ascontiguousarray(data[:, [3, 5, 4]] * swizzle)
+        uv = numpy.ascontiguousarray(data[:, 6:8])
+        return verts, normals, uv
+
+    verts = list(zip(data[0::8], [-v for v in data[2::8]], data[1::8]))
+    normals = list(zip(data[3::8], [-v for v in data[5::8]], data[4::8]))
+    uv = list(zip(data[6::8], data[7::8]))
+    return verts, normals, uv
+
+
+# commands that are valid OBJ8 but have nothing to import
+IGNORED_COMMANDS = ('I', 'A', '800', 'OBJ', 'POINT_COUNTS', 'ANIM_trans_end', 'ANIM_rotate_end')
+
+# ATTR_ commands that replace each other in the attribute state, command -> state slot
+# any other ATTR_ command has a slot of its own
+ATTRIBUTE_SLOTS = {
+    'ATTR_blend': 'blend',
+    'ATTR_no_blend': 'blend',
+    'ATTR_shadow_blend': 'blend',
+    'ATTR_cull': 'cull',
+    'ATTR_no_cull': 'cull',
+    'ATTR_hard': 'hard',
+    'ATTR_hard_deck': 'hard',
+    'ATTR_no_hard': 'hard',
+    'ATTR_shade_flat': 'shade',
+    'ATTR_shade_smooth': 'shade',
+    'ATTR_depth': 'depth',
+    'ATTR_no_depth': 'depth',
+    'ATTR_draw_enable': 'draw',
+    'ATTR_draw_disable': 'draw',
+}
+
+# profiler phase of the commands, anything else is counted as 'commands'
+COMMAND_PHASES = {
+    'VT': 'geometry',
+    'IDX10': 'geometry',
+    'IDX': 'geometry',
+    'TRIS': 'anim tree',
+}
+
+
+class ObjParser:
+    # parses one file, every OBJ8 command has its own handler in self.handlers
+    def __init__(self, filepath, useNumpy=None, profiler=None):
+        # useNumpy: None to use numpy when it is installed, False to force pure Python
+        if(useNumpy is None):
+            useNumpy = numpy is not None
+        self.useNumpy = useNumpy
+        self.model = ObjModel(filepath)
+        self.profiler = profiler or Profiler(False)
+
+        # VT and IDX tokens are collected and converted in chunks
+        self.vtValues = []
+        self.vtChunks = []
+        self.idxValues = []
+        self.idxChunks = []
+
+        # ATTR_ lines since the last TRIS
+        self.attributes = []
+        # the attribute state the lines add up to, state slot -> ATTR_ line
+        # an attribute stays set for all following TRIS until it is replaced
+        self.attributeState = {}
+        self.state = ()
+        self.material = None
+        self.animID = -1
+        # open anim blocks, the last one is the innermost
+        self.animStack = []
+        # keyframes of the open anim block, ranges in self.model.keyframes
+        self.store = self.model.keyframes
+        self.keyframes = Keyframes(self.store)
+        # axis and dataref of the open ANIM_trans_begin / ANIM_rotate_begin table
+        self.keyAxis = (0.0, 0.0, 0.0)
+        self.keyDataref = -1
+        self.obLabel = ''
+        self.objID = 0
+
+        # command token -> handler
+        self.handlers = {
+            'VT': self.parseVT,
+            'IDX10': self.parseIDX,
+            'IDX': self.parseIDX,
+            'TRIS': self.parseTRIS,
+            '#': self.parseLabel,
+            'TEXTURE': self.parseTexture,
+            'TEXTURE_NORMAL': self.parseTextureNormal,
+            'TEXTURE_LIT': self.parseTextureLit,
+            'ANIM_begin': self.parseAnimBegin,
+            'ANIM_end': self.parseAnimEnd,
+            'ANIM_trans': self.parseTrans,
+            'ANIM_trans_begin': self.parseTransBegin,
+            'ANIM_trans_key': self.parseTransKey,
+            'ANIM_rotate': self.parseRotate,
+            'ANIM_rotate_begin': self.parseRotateBegin,
+            'ANIM_rotate_key': self.parseRotateKey,
+            'ANIM_keyframe_loop': self.parseKeyframeLoop,
+            'ANIM_hide': self.parseHide,
+            'ANIM_show': self.parseShow,
+        }
+        for command in IGNORED_COMMANDS:
+            self.handlers[command] = self.ignore
+
+        if(self.profiler.enabled):
+            # time every handler, the rest of the loop is reading and tokenizing
+            for command, handler in self.handlers.items():
+                phase = COMMAND_PHASES.get(command, 'anim tree' if command.startswith('ANIM_') else 'commands')
+                self.handlers[command] = self.profiler.timed(phase, handler)
+            self.parseAttribute = self.profiler.timed('commands', self.parseAttribute)
+
+    def parse(self, lines=None):
+        # lines: the lines to parse instead of reading the file
+        # parseFileSplit passes the command sections, the VT and IDX values are then already in the chunks
+        handlers = self.handlers
+        unknown = self.model.unknownCommands
+        profiler = self.profiler
+        start = time.perf_counter()
+        numLines = 0
+        f = None
+        if(lines is None):
+            f = lines = open(self.model.filepath, 'r')
+        for lineStr in profiler.timedIter('read', lines):
+            numLines += 1
+            line = lineStr.split()
+            if (len(line) == 0):
+                continue
+
+            handler = handlers.get(line[0])
+            if(handler is None):
+                if(line[0].startswith('ATTR_')):
+                    handler = self.parseAttribute
+                elif(line[0].startswith('#')):
+                    # a comment without the space after #
+                    continue
+                else:
+                    # count anything we don't support so it can be reported
+                    unknown[line[0]] = unknown.get(line[0], 0) + 1
+                    continue
+
+            handler(line)
+
+        if(f is not None):
+            f.close()
+
+        model = self.model
+        if(profiler.enabled):
+            # whatever the handlers and the file reading didn't use
+            loopTime = time.perf_counter() - start
+            profiler.add('tokenize', loopTime - sum(seconds for seconds, calls in profiler.phases.values()), numLines)
+
+        with profiler.phase('anim tree'):
+            model.indexDatarefs()
+
+        with profiler.phase('geometry'):
+            self.flushVerts()
+            self.flushIndices()
+            model.verts, model.normals, model.uv = convertVerts(joinChunks(self.vtChunks, 'f', self.useNumpy), self.useNumpy)
+            model.faces = joinChunks(self.idxChunks, 'i', self.useNumpy)
+
+        if(profiler.enabled):
+            profiler.count('lines', numLines)
+            profiler.count('vertices', len(model.verts))
+            profiler.count('indices', len(model.faces))
+            profiler.count('tris groups', self.objID)
+            profiler.count('anim blocks', self.animID + 1)
+            profiler.count('datarefs', len(model.keyframes.datarefs))
+            profiler.count('unknown commands', sum(unknown.values()))
+            profiler.finish()
+            model.profile = profiler
+
+        return model
+
+    def flushVerts(self):
+        self.vtChunks.append(convertValues(self.vtValues, 'f', self.useNumpy))
+        self.vtValues = []
+
+    def flushIndices(self):
+        self.idxChunks.append(convertValues(self.idxValues, 'i', self.useNumpy))
+        self.idxValues = []
+
+    def ignore(self, line):
+        return
+
+    def parseVT(self, line):
+        # VT <x> <y> <z> <nx> <ny> <nz> <u> <v>
+        self.vtValues.extend(line[1:9])
+        if(len(self.vtValues) >= CHUNK_VALUES):
+            self.flushVerts()
+
+    def parseIDX(self, line):
+        # IDX10 <10 indices> or IDX <index>
+        self.idxValues.extend(line[1:])
+        if(len(self.idxValues) >= CHUNK_VALUES):
+            self.flushIndices()
+
+    def parseTexture(self, line):
+        # every TEXTURE line starts a new material
+        self.model.materials.append(Material(line[1]))
+        self.material = len(self.model.materials) - 1
+
+    def parseTextureNormal(self, line):
+        if(self.material is not None):
+            self.model.materials[self.material].normal = line[1]
+
+    def parseTextureLit(self, line):
+        if(self.material is not None):
+            self.model.materials[self.material].lit = line[1]
+
+    def parseLabel(self, line):
+        # if you export with debug mode, labels will be added for each object
+        # we can then name the imported objects better
+        # save as debug label
+        self.obLabel = '_'.join(line[1:])
+
+    def parseAttribute(self, line):
+        # found a custom attribute
+        self.attributes.append(line)
+        command = line[0]
+        if(command == 'ATTR_LOD'):
+            # every LOD starts with the default state
+            self.attributeState = {}
+        elif(command == 'ATTR_reset'):
+            lod = self.attributeState.get('ATTR_LOD')
+            self.attributeState = {'ATTR_LOD': lod} if lod is not None else {}
+        if(command != 'ATTR_reset'):
+            self.attributeState[ATTRIBUTE_SLOTS.get(command, command)] = tuple(line)
+        self.state = tuple(self.attributeState[slot] for slot in sorted(self.attributeState))
+
+    def parseAnimBegin(self, line):
+        if(len(self.animStack)):
+            # a new nested block started
+            # add all the current keyframes to this stack
+            self.animStack[-1].kf = self.keyframes
+
+        # create a new block with unique ID
+        self.animID +=1
+        # add a block to the stack
+        armLabel = self.obLabel if self.obLabel != '' else 'ARM%d' % self.animID
+        self.animStack.append(AnimBlock(armLabel, Keyframes(self.store), None, []))
+        # and track keyframes for this block
+        self.keyframes = Keyframes(self.store)
+
+    def getTransDataref(self, dataref):
+        # translations without a dataref are written with the dataref 'none',
+        # they are static and get ref -1 instead of an entry in the dataref table
+        if(dataref == 'none'):
+            return -1
+        return self.store.intern(dataref)
+
+    def parseTrans(self, line):
+        # ANIM_trans <x1> <y1> <z1> <x2> <y2> <z2> [<v1> <v2> <dataref>]
+        trans1 = (float(line[1]), (float(line[3]) * -1), float(line[2]))
+        trans2 = (float(line[4]), (float(line[6]) * -1), float(line[5]))
+
+        if(len(line) == 7):
+            # position only translation, it has no dataref
+            self.keyframes.append(self.store.add(KEY_LOC, trans1, 0.0, 0.0, -1))
+
+        if(len(line) == 10):
+            # has a dataref, unless it is 'none'
+            dataref = self.getTransDataref(line[9])
+            param1 = float(line[7])
+            param2 = float(line[8])
+            # add two keyframes
+            self.keyframes.append(self.store.add(KEY_LOC, trans1, param1, 0.0, dataref))
+            self.keyframes.append(self.store.add(KEY_LOC, trans2, param2, 0.0, dataref))
+
+    def parseTransBegin(self, line):
+        # the keys of the table only have the position and value
+        self.keyDataref = self.getTransDataref(line[1])
+
+    def parseTransKey(self, line):
+        # ANIM_trans_key <value> <x> <y> <z>
+        vec = (float(line[2]), (float(line[4]) * -1), float(line[3]))
+        self.keyframes.append(self.store.add(KEY_LOC, vec, float(line[1]), 0.0, self.keyDataref))
+
+    def parseRotate(self, line):
+        # ANIM_rotate <x> <y> <z> <r1> <r2> <v1> <v2> [dataref]
+        # we'll always use XYZ Euler as the rotation mode as this seems to be the Blender default
+        if(len(line) == 9):
+            # has a dataref
+            dataref = self.store.intern(line[8])
+            # axis gets mapped as XZY because that will be Blenders XYZ
+            axis = (float(line[1]), (float(line[3]) * -1), float(line[2]))
+            r1 = float(line[4])
+            r2 = float(line[5])
+            v1 = float(line[6])
+            v2 = float(line[7])
+            # add two keyframes
+            self.keyframes.append(self.store.add(KEY_ROT, axis, v1, r1, dataref))
+            self.keyframes.append(self.store.add(KEY_ROT, axis, v2, r2, dataref))
+
+    def parseRotateBegin(self, line):
+        # ANIM_rotate_begin <x> <y> <z> <dataref>
+        # the keys of the table only have the value and angle
+        self.keyAxis = (float(line[1]), (float(line[3]) * -1), float(line[2]))
+        self.keyDataref = self.store.intern(line[4])
+
+    def parseRotateKey(self, line):
+        # ANIM_rotate_key <value> <angle>
+        self.keyframes.append(self.store.add(KEY_ROT, self.keyAxis, float(line[1]), float(line[2]), self.keyDataref))
+
+    def parseKeyframeLoop(self, line):
+        # add dataref loop property
+        self.keyframes.append(self.store.add(KEY_LOOP, (0.0, 0.0, 0.0), float(line[1]), 0.0, -1))
+
+    def parseHide(self, line):
+        # ANIM_hide <v1> <v2> <dataref>
+        v1 = float(line[1])
+        v2 = float(line[2])
+        dataref = self.store.intern(line[3])
+        self.keyframes.append(self.store.add(KEY_HIDE, (0.0, 0.0, 0.0), v1, v2, dataref))
+
+    def parseShow(self, line):
+        # ANIM_show <v1> <v2> <dataref>
+        v1 = float(line[1])
+        v2 = float(line[2])
+        dataref = self.store.intern(line[3])
+        self.keyframes.append(self.store.add(KEY_SHOW, (0.0, 0.0, 0.0), v1, v2, dataref))
+
+    def parseTRIS(self, line):
+        # TRIS <offset> <count>
+        tris_offset, tris_count = int(line[1]), int(line[2])
+
+        hasLabel = self.obLabel != ''
+        if(not hasLabel):
+            self.obLabel = 'OBJ%d' % self.objID
+
+        meshObject = TrisGroup(self.objID, self.obLabel, tris_offset, tris_count, self.material, self.attributes, self.keyframes, hasLabel, self.state)
+
+        if(len(self.animStack)):
+            # this is in an anim block, so add it to the last block in the stack
+            self.animStack[-1].meshes.append(meshObject)
+        else:
+            # this is just a plain mesh, add it to the loose objects list
+            self.model.objects.append(meshObject)
+
+        self.obLabel = ''
+        self.objID += 1
+        self.attributes = []
+
+    def parseAnimEnd(self, line):
+        if(len(self.animStack)):
+            # pop the last block and assign to an armature
+            anim = self.animStack.pop()
+            armKeyframes = anim.kf
+            if(len(self.keyframes)):
+                # add any remaining animations from parent anim blocks
+                armKeyframes = armKeyframes + self.keyframes
+                if(len(self.animStack)):
+                    # if there is previous anim on the stack, that is the parent
+                    anim.parent = self.animStack[-1]
+                    anim.parent.children.append(anim)
+
+            if(anim.parent is not None or len(anim.children)):
+                # requires an armature to handle nested animation
+                anim.kf = armKeyframes
+                self.model.armatures.append(anim)
+            else:
+                # append to objects since this does not have a parent or child
+                self.model.objects.extend(anim.meshes)
+
+        # clear some vars
+        self.keyframes = Keyframes(self.store)
+
+
+def parseFile(filepath, useNumpy=None, profile=False):
+    # useNumpy: None to use numpy when it is installed, False to force pure Python
+    # profile: store the parser timings in model.profile
+    return ObjParser(filepath, useNumpy, Profiler() if profile else None).parse()
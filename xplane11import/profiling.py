@@ -0,0 +1,144 @@
+#---------------------------------------------------------------------------
+#
+#  Timings and counters for the import phases
+#
+#  A Profiler collects the wall time of each phase, counters and the time
+#  of the individual objects. It is plain Python so the parser can fill it
+#  in worker processes, the reports are merged in the importer.
+#
+#---------------------------------------------------------------------------
+
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+# number of objects listed in the report
+SLOWEST_OBJECTS = 10
+
+
+def getPeakMemoryKB():
+    # peak resident memory of this process, None if it can't be measured
+    if(resource is None):
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macOS bytes
+    if(sys.platform == 'darwin'):
+        peak = peak // 1024
+    return peak
+
+
+class Profiler:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        # phase name -> [seconds, calls]
+        self.phases = {}
+        self.counters = {}
+        # (seconds, object name)
+        self.objects = []
+        self.peakMemoryKB = None
+
+    @contextmanager
+    def phase(self, name):
+        if(not self.enabled):
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds, calls=1):
+        if(not self.enabled):
+            return
+        entry = self.phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += calls
+
+    def count(self, name, value=1):
+        if(not self.enabled):
+            return
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def addObject(self, name, seconds):
+        if(not self.enabled):
+            return
+        self.objects.append( (seconds, name) )
+
+    def timed(self, name, function):
+        # wrap a function so every call is added to a phase
+        if(not self.enabled):
+            return function
+        def timedFunction(*args):
+            start = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self.add(name, time.perf_counter() - start)
+        return timedFunction
+
+    def timedIter(self, name, iterable):
+        # time how long it takes to get each item, e.g. reading the lines of a file
+        if(not self.enabled):
+            return iterable
+        return self.timedIterator(name, iter(iterable))
+
+    def timedIterator(self, name, iterator):
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, time.perf_counter() - start, 0)
+                return
+            self.add(name, time.perf_counter() - start, 0)
+            yield item
+
+    def finish(self):
+        # keeps the highest peak of this process and the merged worker processes
+        if(self.enabled):
+            peak = getPeakMemoryKB()
+            if(peak is not None):
+                self.peakMemoryKB = max(self.peakMemoryKB or 0, peak)
+
+    def merge(self, other):
+        # add the results of another profiler, e.g. from a parser worker
+        if(not self.enabled or other is None):
+            return
+        for name, (seconds, calls) in other.phases.items():
+            self.add(name, seconds, calls)
+        for name, value in other.counters.items():
+            self.count(name, value)
+        self.objects.extend(other.objects)
+        if(other.peakMemoryKB is not None):
+            self.peakMemoryKB = max(self.peakMemoryKB or 0, other.peakMemoryKB)
+
+    def getReport(self):
+        slowest = sorted(self.objects, reverse=True)[:SLOWEST_OBJECTS]
+        return {
+            'phases': {name: {'seconds': round(seconds, 6), 'calls': calls} for name, (seconds, calls) in self.phases.items()},
+            'counters': dict(self.counters),
+            'peakMemoryKB': self.peakMemoryKB,
+            'slowestObjects': [{'name': name, 'seconds': round(seconds, 6)} for seconds, name in slowest],
+        }
+
+    def writeReport(self, filepath):
+        f = open(filepath, 'w')
+        json.dump(self.getReport(), f, indent=2)
+        f.close()
+
+    def getSummary(self):
+        # one line per phase for the console and the Blender info log
+        lines = ['%s: %.3fs' % (name, seconds) for name, (seconds, calls) in self.phases.items()]
+        if(self.peakMemoryKB is not None):
+            lines.append('peak memory: %.1f MB' % (self.peakMemoryKB / 1024.0))
+        for seconds, name in sorted(self.objects, reverse=True)[:SLOWEST_OBJECTS]:
+            lines.append('slow object %s: %.3fs' % (name, seconds))
+        return lines
@@ -0,0 +1,241 @@
+#---------------------------------------------------------------------------
+#
+#  Parse one large .obj file with several processes
+#
+#  The VT and IDX lines are most of an OBJ8 file and every line stands on
+#  its own. The file is scanned for the byte ranges of the two sections,
+#  the ranges are cut at line ends and converted by worker processes that
+#  write straight into shared memory arrays. The arrays are allocated from
+#  the POINT_COUNTS line before the workers start. The main process parses
+#  the command sections (header, anim blocks, TRIS) meanwhile.
+#
+#  Files that are small, or don't have one block of VT lines followed by
+#  one block of IDX lines, are parsed the normal way.
+#
+#---------------------------------------------------------------------------
+
+import mmap
+import os
+from array import array
+
+from .parser import ObjParser, parseFile, convertValues, convertVerts, numpy
+from .profiling import Profiler
+from .workers import createPool, reportPoolError, POOL_ERRORS
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python 3.7 (Blender 2.8x) has no shared memory
+    shared_memory = None
+
+# smaller files are faster to parse than to start the workers for
+MIN_SPLIT_SIZE = 32 * 1024 * 1024
+# bytes of VT or IDX lines converted by one task
+PIECE_SIZE = 8 * 1024 * 1024
+# VT values per line: x y z nx ny nz u v
+VT_VALUES = 8
+# starts of the VT and IDX/IDX10 lines, the values may be separated by spaces or tabs
+VT_PREFIXES = (b'VT ', b'VT\t')
+IDX_PREFIXES = (b'IDX',)
+
+
+def findLineStart(mm, prefixes, start=0, end=None):
+    # offset of the first line that starts with one of the prefixes, or -1
+    if(start == 0 and any(mm[:len(prefix)] == prefix for prefix in prefixes)):
+        return 0
+    found = [mm.find(b'\n' + prefix, start, len(mm) if end is None else end) for prefix in prefixes]
+    found = [pos for pos in found if pos >= 0]
+    return min(found) + 1 if len(found) else -1
+
+
+def findLastLineEnd(mm, prefixes, start, end):
+    # offset after the last line in [start, end) that starts with one of the prefixes
+    pos = max(mm.rfind(b'\n' + prefix, start, end) for prefix in prefixes)
+    pos = pos + 1 if pos >= 0 else start
+    lineEnd = mm.find(b'\n', pos)
+    return lineEnd + 1 if lineEnd >= 0 else len(mm)
+
+
+def countLines(data, keyword):
+    # number of lines in data that start with keyword, data starts at a line start
+    return data.count(b'\n' + keyword) + (1 if data.startswith(keyword) else 0)
+
+
+def getPointCounts(header):
+    # POINT_COUNTS <vertices> <line vertices> <lights> <indices>
+    for line in header.splitlines():
+        tokens = line.split()
+        if(len(tokens) >= 5 and tokens[0] == b'POINT_COUNTS'):
+            return int(tokens[1]), int(tokens[4])
+    return None
+
+
+def splitRange(mm, start, end, pieceSize):
+    # cut [start, end) into pieces that end at line ends
+    pieces = []
+    while(start < end):
+        cut = mm.find(b'\n', min(start + pieceSize, end - 1), end)
+        cut = cut + 1 if cut >= 0 else end
+        pieces.append( (start, cut) )
+        start = cut
+    return pieces
+
+
+def countValues(mm, pieces, keyword):
+    # number of values in each piece, or None if a piece has other lines than keyword lines
+    counts = []
+    for start, end in pieces:
+        data = mm[start:end]
+        numLines = data.count(b'\n') + (0 if data.endswith(b'\n') else 1)
+        if(keyword == b'VT'):
+            if(countLines(data, b'VT') != numLines):
+                return None
+            counts.append(numLines * VT_VALUES)
+        else:
+            # IDX10 has 10 indices, IDX one
+            numIdx10 = countLines(data, b'IDX10')
+            if(countLines(data, b'IDX') != numLines):
+                return None
+            counts.append(numIdx10 * 10 + numLines - numIdx10)
+    return counts
+
+
+def convertPiece(filepath, start, end, keyword, typecode, shmName, offset, useNumpy):
+    # runs in a worker, converts the values of a byte range of the file
+    # and writes them to the shared array at the value offset
+    f = open(filepath, 'rb')
+    f.seek(start)
+    data = f.read(end - start)
+    f.close()
+    if(keyword == b'VT'):
+        data = data.replace(b'VT', b'')
+    else:
+        data = data.replace(b'IDX10', b'').replace(b'IDX', b'')
+    values = convertValues(data.decode('ascii').split(), typecode, useNumpy)
+
+    shm = shared_memory.SharedMemory(name=shmName)
+    try:
+        # 4 bytes per value for both float32 and int32
+        shm.buf[offset * 4:(offset + len(values)) * 4] = values.tobytes()
+    finally:
+        shm.close()
+    return len(values)
+
+
+def readShared(shm, count, typecode, useNumpy):
+    # copy the values out of the shared memory before it is released
+    if(useNumpy):
+        return numpy.frombuffer(shm.buf, dtype=numpy.float32 if typecode == 'f' else numpy.int32, count=count).copy()
+    values = array(typecode)
+    values.frombytes(shm.buf[:count * 4])
+    return values
+
+
+def parseFileSplit(filepath, maxWorkers=None, useNumpy=None, profile=False):
+    # parse one file with its VT and IDX sections split over maxWorkers processes
+    # maxWorkers: None for one worker per core, 1 to parse in this process
+    # returns the same ObjModel as parseFile
+    if(maxWorkers == 1 or shared_memory is None or os.path.getsize(filepath) < MIN_SPLIT_SIZE):
+        return parseFile(filepath, useNumpy, profile)
+    if(useNumpy is None):
+        useNumpy = numpy is not None
+
+    profiler = Profiler(profile)
+    f = open(filepath, 'rb')
+    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        with profiler.phase('scan'):
+            sections = findSections(mm)
+        if(sections is None):
+            print('Unexpected VT/IDX layout, parsing %s in a single process' % os.path.basename(filepath))
+            return parseFile(filepath, useNumpy, profile)
+        return parseSections(filepath, mm, sections, maxWorkers, useNumpy, profiler)
+    finally:
+        mm.close()
+        f.close()
+
+
+def findSections(mm):
+    # returns the pieces of the VT and IDX sections and their value counts,
+    # the command sections and the POINT_COUNTS or None if the file can't be split
+    vtStart = findLineStart(mm, VT_PREFIXES)
+    if(vtStart < 0):
+        return None
+    idxStart = findLineStart(mm, IDX_PREFIXES, vtStart)
+    if(idxStart < 0):
+        return None
+    vtEnd = findLastLineEnd(mm, VT_PREFIXES, vtStart - 1, idxStart)
+    idxEnd = findLastLineEnd(mm, IDX_PREFIXES, idxStart - 1, len(mm))
+    # the sections must not continue somewhere else
+    if(findLineStart(mm, VT_PREFIXES, vtEnd - 1) >= 0 or findLineStart(mm, IDX_PREFIXES, 0, vtStart) >= 0):
+        return None
+
+    vtPieces = splitRange(mm, vtStart, vtEnd, PIECE_SIZE)
+    idxPieces = splitRange(mm, idxStart, idxEnd, PIECE_SIZE)
+    vtCounts = countValues(mm, vtPieces, b'VT')
+    idxCounts = countValues(mm, idxPieces, b'IDX')
+    if(vtCounts is None or idxCounts is None):
+        return None
+
+    # preallocate from POINT_COUNTS, it must match the file
+    pointCounts = getPointCounts(mm[:vtStart])
+    if(pointCounts is None or pointCounts != (sum(vtCounts) // VT_VALUES, sum(idxCounts))):
+        return None
+
+    commands = [ (0, vtStart), (vtEnd, idxStart), (idxEnd, len(mm)) ]
+    return vtPieces, vtCounts, idxPieces, idxCounts, commands, pointCounts
+
+
+def parseSections(filepath, mm, sections, maxWorkers, useNumpy, profiler):
+    vtPieces, vtCounts, idxPieces, idxCounts, commands, pointCounts = sections
+    numVerts, numIndices = pointCounts
+    # one shared array per section, 4 bytes per value
+    vtShared = shared_memory.SharedMemory(create=True, size=max(numVerts * VT_VALUES * 4, 1))
+    idxShared = shared_memory.SharedMemory(create=True, size=max(numIndices * 4, 1))
+    try:
+        tasks = []
+        for pieces, counts, keyword, typecode, shm in ((vtPieces, vtCounts, b'VT', 'f', vtShared), (idxPieces, idxCounts, b'IDX', 'i', idxShared)):
+            offset = 0
+            for (start, end), count in zip(pieces, counts):
+                tasks.append( (start, end, keyword, typecode, shm.name, offset) )
+                offset += count
+
+        # the parser has its own profiler, it counts everything it doesn't time as tokenizing
+        parser = ObjParser(filepath, useNumpy, Profiler() if profiler.enabled else None)
+        pool = createPool(maxWorkers)
+        if(pool is None):
+            return parseFile(filepath, useNumpy, profiler.enabled)
+        try:
+            with pool:
+                with profiler.phase('split geometry'):
+                    futures = [pool.submit(convertPiece, filepath, *task, useNumpy) for task in tasks]
+                # the commands are parsed while the workers convert the values
+                lines = []
+                for start, end in commands:
+                    lines.extend(mm[start:end].decode('utf-8', 'replace').splitlines())
+                model = parser.parse(lines)
+                with profiler.phase('split geometry'):
+                    written = sum(future.result() for future in futures)
+        except POOL_ERRORS as e:
+            reportPoolError(e)
+            return parseFile(filepath, useNumpy, profiler.enabled)
+        if(written != numVerts * VT_VALUES + numIndices):
+            raise ValueError('%s: expected %d values, converted %d' % (filepath, numVerts * VT_VALUES + numIndices, written))
+
+        with profiler.phase('geometry'):
+            vtData = readShared(vtShared, numVerts * VT_VALUES, 'f', useNumpy)
+            model.faces = readShared(idxShared, numIndices, 'i', useNumpy)
+            model.verts, model.normals, model.uv = convertVerts(vtData, useNumpy)
+    finally:
+        for shm in (vtShared, idxShared):
+            shm.close()
+            shm.unlink()
+
+    if(profiler.enabled):
+        profiler.merge(model.profile)
+        profiler.count('split tasks', len(tasks))
+        profiler.count('vertices', len(model.verts))
+        profiler.count('indices', len(model.faces))
+        profiler.finish()
+        model.profile = profiler
+    return model
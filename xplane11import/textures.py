@@ -0,0 +1,71 @@
+#---------------------------------------------------------------------------
+#
+#  Image cache shared by all materials and all imports in a Blender session
+#
+#  Objects of the same aircraft or scenery package usually share one
+#  texture atlas, so each image file is only loaded and decoded once.
+#
+#  Only the names of the images are kept, they are looked up in bpy.data
+#  again for every use. A reference to the image itself would point to
+#  freed memory after an undo or when another .blend file is opened.
+#
+#---------------------------------------------------------------------------
+
+import os
+import bpy
+
+# (obj directory, texture name from the obj) -> path of the file that exists
+resolvedPaths = {}
+# absolute image path -> name of the bpy image
+imageCache = {}
+
+
+def resolveTexturePath(directory, filename):
+    # find the image file, X-Plane falls back to .dds when the named file is missing
+    key = (directory, filename)
+    path = resolvedPaths.get(key)
+    if(path is not None):
+        return path
+
+    base = os.path.splitext(filename)[0]
+    for candidate in (filename, base + '.dds'):
+        # obj files may use either path separator
+        path = os.path.normpath(os.path.join(directory, candidate.replace('\\', '/')))
+        if(os.path.isfile(path)):
+            # only found files are cached, a missing texture may be added later
+            resolvedPaths[key] = path
+            return path
+
+    return None
+
+
+def loadImage(directory, filename):
+    # returns the bpy image for a texture of the obj, or None if it can't be loaded
+    path = resolveTexturePath(directory, filename)
+    if(path is None):
+        print('Cannot find image file: ' + filename)
+        return None
+
+    name = imageCache.get(path)
+    if(name is not None):
+        image = bpy.data.images.get(name)
+        # the image may have been deleted or renamed since the last import
+        if(image is not None and os.path.normpath(bpy.path.abspath(image.filepath)) == path):
+            return image
+        del imageCache[path]
+
+    try:
+        # check_existing reuses an image that is already loaded in the blend file
+        image = bpy.data.images.load(path, check_existing=True)
+    except Exception as e:
+        print('Cannot load image file: ' + path)
+        print(e)
+        return None
+
+    imageCache[path] = image.name
+    return image
+
+
+def clearTextureCache():
+    resolvedPaths.clear()
+    imageCache.clear()
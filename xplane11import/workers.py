@@ -0,0 +1,49 @@
+#---------------------------------------------------------------------------
+#
+#  Worker processes for the parser
+#
+#  The workers are started with 'spawn', forking a running Blender is not
+#  safe. A spawned worker runs the Python interpreter, which is not
+#  sys.executable in Blender 2.80 - 2.90: there it is the Blender binary
+#  and the workers would never start. Those versions have the path of
+#  their Python in bpy.app.binary_path_python instead.
+#
+#  Like the parser, this module does not need Blender.
+#
+#---------------------------------------------------------------------------
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# errors of a pool whose workers could not be started or died
+POOL_ERRORS = (OSError, BrokenProcessPool)
+
+
+def getPythonExecutable():
+    # the Python interpreter for the workers, or None if there is none
+    bpy = sys.modules.get('bpy')
+    if(bpy is not None and bpy.app.version < (2, 91, 0)):
+        executable = getattr(bpy.app, 'binary_path_python', '')
+        return executable if os.path.isfile(executable) else None
+    return sys.executable or None
+
+
+def createPool(maxWorkers=None):
+    # a process pool with maxWorkers workers, None for one per core
+    # returns None if worker processes can't be started here
+    executable = getPythonExecutable()
+    if(executable is None):
+        print('No Python interpreter for the worker processes, parsing in a single process')
+        return None
+    context = multiprocessing.get_context('spawn')
+    context.set_executable(executable)
+    return ProcessPoolExecutor(max_workers=maxWorkers, mp_context=context)
+
+
+def reportPoolError(e):
+    # some Blender builds can't start worker processes
+    print('Parallel parsing failed, parsing in a single process')
+    print(e)